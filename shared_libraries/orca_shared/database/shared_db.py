@@ -8,11 +8,13 @@ import functools
 import json
 import os
 import random
+import threading
 import time
-from typing import Any, Callable, Dict, TypeVar
+from typing import Any, Callable, Dict, Tuple, TypeVar
 
 import boto3
 from aws_lambda_powertools import Logger
+from botocore.client import BaseClient
 from sqlalchemy import create_engine
 from sqlalchemy.engine import URL
 from sqlalchemy.exc import OperationalError
@@ -26,11 +28,61 @@ BACKOFF_FACTOR = 2  # Value of the factor used to backoff
 INITIAL_BACKOFF_IN_SECONDS = 1  # Number of seconds to sleep the first time through.
 RT = TypeVar("RT")  # return type
 
+# Engines by (host, port, database, username). Kept at module level so warm lambda
+# invocations reuse the engine and its connection pool instead of reconnecting
+# each time. The password is left out of the key so that a rotated secret replaces
+# the old engine instead of leaving it and its pooled connections behind.
+_ENGINES: Dict[Tuple[Any, Any, Any, Any], Engine] = {}
+
+# A lambda container handles one invocation at a time, so keep a single pooled
+# connection per engine with a little overflow for nested connections.
+POOL_SIZE = 1
+POOL_MAX_OVERFLOW = 2
+# Reconnect pooled connections older than this many seconds, before the server
+# or a proxy in between closes them.
+POOL_RECYCLE_SECONDS = 300
+
+# Number of seconds a retrieved configuration is reused before the secret is read
+# again, so rotated secrets are eventually picked up by warm lambdas.
+CONFIGURATION_CACHE_TTL_SECONDS = 15 * 60
+
+# Configurations by (secret ARN, region), with the monotonic time they expire at.
+_CONFIGURATIONS: Dict[Tuple[str, str], Tuple[Dict[str, str], float]] = {}
+
+# Secrets Manager clients by region, reused across warm lambda invocations.
+_SECRETSMANAGER_CLIENTS: Dict[str, BaseClient] = {}
+# Creating clients from the default boto3 session is not thread safe.
+_SECRETSMANAGER_CLIENTS_LOCK = threading.Lock()
+
+
+def _get_secretsmanager_client(aws_region: str) -> BaseClient:
+    """
+    Gets the Secrets Manager client for the region, creating it on first use.
+    Creation is locked, since the default boto3 session is not thread safe.
+
+    Args:
+        aws_region (str): The AWS region the secret is stored in.
+
+    Returns:
+        BaseClient: A boto3 secretsmanager client.
+    """
+    secretsmanager = _SECRETSMANAGER_CLIENTS.get(aws_region, None)
+    if secretsmanager is None:
+        with _SECRETSMANAGER_CLIENTS_LOCK:
+            secretsmanager = _SECRETSMANAGER_CLIENTS.get(aws_region, None)
+            if secretsmanager is None:
+                LOGGER.debug("Creating secretsmanager resource.")
+                secretsmanager = boto3.client("secretsmanager", region_name=aws_region)
+                _SECRETSMANAGER_CLIENTS[aws_region] = secretsmanager
+    return secretsmanager
+
 
 def get_configuration(db_connect_info_secret_arn: str) -> Dict[str, str]:
     """
     Create a dictionary of configuration values based on environment variables
     and secret information items needed to create ORCA database connections.
+    The secret is cached for CONFIGURATION_CACHE_TTL_SECONDS, so warm lambda
+    invocations do not read it again.
 
     ```
     Environment Variables:
@@ -57,9 +109,15 @@ def get_configuration(db_connect_info_secret_arn: str) -> Dict[str, str]:
         LOGGER.critical(message)
         raise Exception(message)
 
+    cache_key = (db_connect_info_secret_arn, aws_region)
+    cached_configuration = _CONFIGURATIONS.get(cache_key)
+    if cached_configuration is not None and time.monotonic() < cached_configuration[1]:
+        LOGGER.debug("Using cached db login info.")
+        # Copy so callers cannot modify the cached configuration.
+        return dict(cached_configuration[0])
+
     try:
-        LOGGER.debug("Creating secretsmanager resource.")
-        secretsmanager = boto3.client("secretsmanager", region_name=aws_region)
+        secretsmanager = _get_secretsmanager_client(aws_region)
 
         LOGGER.debug(
             "Retrieving db login info for both user and admin as a dictionary."
@@ -76,6 +134,11 @@ def get_configuration(db_connect_info_secret_arn: str) -> Dict[str, str]:
         LOGGER.critical("Failed to retrieve secret.", exc_info=True)
         raise Exception("Failed to retrieve secret manager value.")
 
+    _CONFIGURATIONS[cache_key] = (
+        dict(config),
+        time.monotonic() + CONFIGURATION_CACHE_TTL_SECONDS,
+    )
+
     # return the config dict
     return config
 
@@ -83,6 +146,8 @@ def get_configuration(db_connect_info_secret_arn: str) -> Dict[str, str]:
 def _create_connection(**kwargs: Any) -> Engine:
     """
     Base function for creating a connection engine that can connect to a database.
+    Engines are cached by connection information and reused on later calls.
+    If the password has changed, the cached engine is disposed and replaced.
 
     Args:
         host (str): Database host to connect to
@@ -96,7 +161,32 @@ def _create_connection(**kwargs: Any) -> Engine:
     """
     LOGGER.debug("Creating URL object to connect to the database.")
     connection_url = URL.create(drivername="postgresql", **kwargs)
-    return create_engine(connection_url, future=True)
+    cache_key = (
+        connection_url.host,
+        connection_url.port,
+        connection_url.database,
+        connection_url.username,
+    )
+    engine = _ENGINES.get(cache_key)
+    if engine is not None and engine.url != connection_url:
+        LOGGER.debug("Connection information changed. Disposing of old engine.")
+        engine.dispose()
+        engine = None
+    if engine is None:
+        # values_plus_batch has psycopg2 group executemany UPDATE/DELETE statements
+        # into pages instead of sending one statement per parameter set.
+        # pool_pre_ping replaces pooled connections dropped while the lambda was idle.
+        engine = create_engine(
+            connection_url,
+            future=True,
+            executemany_mode="values_plus_batch",
+            pool_pre_ping=True,
+            pool_size=POOL_SIZE,
+            max_overflow=POOL_MAX_OVERFLOW,
+            pool_recycle=POOL_RECYCLE_SECONDS,
+        )
+        _ENGINES[cache_key] = engine
+    return engine
 
 
 def get_admin_connection(config: Dict[str, str], database: str = None) -> Engine:
@@ -117,7 +207,7 @@ def get_admin_connection(config: Dict[str, str], database: str = None) -> Engine
         admin_database = database
 
     LOGGER.debug("Creating admin user connection object.")
-    LOGGER.debug(f"Database set to {admin_database} for the connection.")
+    LOGGER.debug("Database set to %s for the connection.", admin_database)
     connection = _create_connection(
         host=config["host"],
         port=config["port"],
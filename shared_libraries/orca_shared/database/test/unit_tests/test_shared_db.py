@@ -31,6 +31,8 @@ class TestSharedDatabaseLibraries(unittest.TestCase):
         Perform initial setup for test.
         """
         self.mock_sm.start()
+        shared_db._CONFIGURATIONS.clear()
+        shared_db._SECRETSMANAGER_CLIENTS.clear()
         self.test_sm = boto3.client("secretsmanager", region_name="us-west-2")
         self.secretstring = """
             {
@@ -71,6 +73,45 @@ class TestSharedDatabaseLibraries(unittest.TestCase):
 
         self.assertEqual(json.loads(self.secretstring), testing_config)
 
+    @patch.dict(
+        os.environ,
+        {
+            "AWS_REGION": "us-west-2",
+        },
+        clear=True,
+    )
+    @patch("time.monotonic")
+    def test_get_configuration_cached_until_ttl(self, mock_monotonic: MagicMock):
+        """
+        The secret should only be read again once the cached configuration expires.
+        """
+        mock_monotonic.return_value = 1000
+        first_config = shared_db.get_configuration(self.db_connect_info_secret_arn)
+        first_config["host"] = "modified.host"
+
+        with patch.object(
+            shared_db._SECRETSMANAGER_CLIENTS["us-west-2"],
+            "get_secret_value",
+            wraps=shared_db._SECRETSMANAGER_CLIENTS["us-west-2"].get_secret_value,
+        ) as mock_get_secret_value:
+            mock_monotonic.return_value = (
+                1000 + shared_db.CONFIGURATION_CACHE_TTL_SECONDS - 1
+            )
+            cached_config = shared_db.get_configuration(self.db_connect_info_secret_arn)
+            mock_get_secret_value.assert_not_called()
+            self.assertEqual(json.loads(self.secretstring), cached_config)
+
+            mock_monotonic.return_value = (
+                1000 + shared_db.CONFIGURATION_CACHE_TTL_SECONDS
+            )
+            refreshed_config = shared_db.get_configuration(
+                self.db_connect_info_secret_arn
+            )
+            mock_get_secret_value.assert_called_once_with(
+                SecretId=self.db_connect_info_secret_arn
+            )
+            self.assertEqual(json.loads(self.secretstring), refreshed_config)
+
     @patch.dict(
         os.environ,
         {},
@@ -178,6 +219,7 @@ class TestSharedDatabaseLibraries(unittest.TestCase):
         },
         clear=True,
     )
+    @patch.dict(shared_db._ENGINES, clear=True)
     @patch("orca_shared.database.shared_db.create_engine")
     def test__create_connection_call_values(self, mock_connection: MagicMock):
         """
@@ -193,7 +235,75 @@ class TestSharedDatabaseLibraries(unittest.TestCase):
 
         user_db_url = URL.create(drivername="postgresql", **user_db_call)
         _ = shared_db._create_connection(**user_db_call)
-        mock_connection.assert_called_once_with(user_db_url, future=True)
+        mock_connection.assert_called_once_with(
+            user_db_url,
+            future=True,
+            executemany_mode="values_plus_batch",
+            pool_pre_ping=True,
+            pool_size=shared_db.POOL_SIZE,
+            max_overflow=shared_db.POOL_MAX_OVERFLOW,
+            pool_recycle=shared_db.POOL_RECYCLE_SECONDS,
+        )
+
+    @patch.dict(shared_db._ENGINES, clear=True)
+    @patch("orca_shared.database.shared_db.create_engine")
+    def test__create_connection_reuses_engine(self, mock_connection: MagicMock):
+        """
+        Tests that engines are reused for the same connection information,
+        and that new connection information creates a new engine.
+        """
+        user_db_call = {
+            "host": "aws.postgresrds.host",
+            "port": "5432",
+            "database": "user_db",
+            "username": "user",
+            "password": "user123",
+        }
+        mock_connection.side_effect = lambda url, **kwargs: Mock(url=url)
+
+        first_engine = shared_db._create_connection(**user_db_call)
+        second_engine = shared_db._create_connection(**user_db_call)
+        self.assertIs(first_engine, second_engine)
+        mock_connection.assert_called_once()
+
+        other_engine = shared_db._create_connection(
+            **{**user_db_call, "database": "admin_db"}
+        )
+        self.assertIsNot(first_engine, other_engine)
+        self.assertEqual(2, mock_connection.call_count)
+        first_engine.dispose.assert_not_called()
+
+    @patch.dict(shared_db._ENGINES, clear=True)
+    @patch("orca_shared.database.shared_db.create_engine")
+    def test__create_connection_rotated_password_replaces_engine(
+        self, mock_connection: MagicMock
+    ):
+        """
+        Tests that a changed password disposes of the cached engine
+        and replaces it, rather than keeping both engines.
+        """
+        user_db_call = {
+            "host": "aws.postgresrds.host",
+            "port": "5432",
+            "database": "user_db",
+            "username": "user",
+            "password": "user123",
+        }
+        mock_connection.side_effect = lambda url, **kwargs: Mock(url=url)
+
+        old_engine = shared_db._create_connection(**user_db_call)
+        new_engine = shared_db._create_connection(
+            **{**user_db_call, "password": "rotated456"}
+        )
+
+        self.assertIsNot(old_engine, new_engine)
+        old_engine.dispose.assert_called_once_with()
+        self.assertEqual(2, mock_connection.call_count)
+        self.assertEqual([new_engine], list(shared_db._ENGINES.values()))
+        self.assertIs(
+            new_engine,
+            shared_db._create_connection(**{**user_db_call, "password": "rotated456"}),
+        )
 
     @patch("time.sleep")
     def test_retry_operational_error_happy_path(self, mock_sleep: MagicMock):
@@ -115,16 +115,21 @@ def internal_update_job(
         raise
 
 
+# Statements without dynamic identifiers are built once and reused by their
+# *_sql functions.
+_UPDATE_JOB_SQL = text(
+    """
+    UPDATE
+        orca.reconcile_job
+    SET
+        status_id = :status_id,
+        last_update = :last_update,
+        end_time = :end_time,
+        error_message = :error_message
+    WHERE
+        id = :id"""
+)
+
+
 def update_job_sql() -> text:  # pragma: no cover
-    return text(
-        """
-        UPDATE
-            orca.reconcile_job
-        SET
-            status_id = :status_id,
-            last_update = :last_update,
-            end_time = :end_time,
-            error_message = :error_message
-        WHERE
-            id = :id"""
-    )
+    return _UPDATE_JOB_SQL
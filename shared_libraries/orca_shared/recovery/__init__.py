@@ -3,8 +3,12 @@ from .shared_recovery import (
     LOGGER,
     OrcaStatus,
     RequestMethod,
+    build_file_status_update,
     create_status_for_job,
     get_aws_region,
+    get_deduplication_id,
+    get_sqs_client,
+    post_entries_to_fifo_queue,
     post_entry_to_fifo_queue,
     post_entry_to_standard_queue,
     update_status_for_file,
@@ -5,19 +5,43 @@ Description: Shared library that combines common functions and classes needed fo
 """
 # Standard libraries
 import hashlib
-import json
 import os
+import threading
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 # Third party libraries
 import boto3
+import orjson
 from aws_lambda_powertools import Logger
+from botocore.client import BaseClient
+from botocore.config import Config
 
 # Set AWS powertools
 LOGGER = Logger()
 
+# Maximum number of entries SQS accepts in a single send_message_batch call.
+SQS_MAX_BATCH_SIZE = 10
+
+# Number of times post_entries_to_fifo_queue resends entries SQS reports as failed.
+SQS_MAX_BATCH_RETRIES = 3
+
+# Message group used for all messages posted to the FIFO status queue.
+FIFO_MESSAGE_GROUP_ID = "request_files"
+
+# SQS clients by region. Kept at module level so warm lambda invocations
+# reuse the client instead of rebuilding it for every message.
+_SQS_CLIENTS: Dict[str, BaseClient] = {}
+# Creating clients from the default boto3 session is not thread safe.
+_SQS_CLIENTS_LOCK = threading.Lock()
+
+# Let botocore retry throttled and transient SQS errors with exponential backoff,
+# slowing down client side when SQS starts throttling.
+# The client is shared across threads, so allow more than the default 10
+# pooled connections.
+SQS_CLIENT_CONFIG = Config(retries={"mode": "adaptive"}, max_pool_connections=32)
+
 
 class RequestMethod(Enum):
     """
@@ -41,6 +65,21 @@ class OrcaStatus(Enum):
     SUCCESS = 4
 
 
+# MessageAttributes for each request method, built once and shared by every post.
+_REQUEST_METHOD_ATTRIBUTES = {
+    request_method: {
+        "RequestMethod": {
+            "DataType": "String",
+            "StringValue": request_method.value,
+        }
+    }
+    for request_method in RequestMethod
+}
+
+# Statuses that mark a file as complete and require a completion_time.
+_COMPLETED_STATUSES = frozenset({OrcaStatus.SUCCESS, OrcaStatus.FAILED})
+
+
 def get_aws_region() -> str:
     """
     Gets AWS region variable from the runtime environment variable.
@@ -55,10 +94,31 @@ def get_aws_region() -> str:
         message = "Runtime environment variable AWS_REGION is not set."
         LOGGER.critical(message)
         raise ValueError(message)
-    LOGGER.debug(f"Got environment variable for AWS_REGION = {aws_region}")
+    LOGGER.debug("Got environment variable for AWS_REGION = %s", aws_region)
     return aws_region
 
 
+def get_sqs_client() -> BaseClient:
+    """
+    Gets the SQS client for the current AWS region, creating it on first use.
+    Boto3 clients are thread safe, so the client may be shared across threads.
+        Returns:
+            A boto3 SQS client.
+    """
+    aws_region = get_aws_region()
+    sqs_client = _SQS_CLIENTS.get(aws_region, None)
+    if sqs_client is None:
+        with _SQS_CLIENTS_LOCK:
+            sqs_client = _SQS_CLIENTS.get(aws_region, None)
+            if sqs_client is None:
+                LOGGER.debug("Creating SQS client for %s", aws_region)
+                sqs_client = boto3.client(
+                    "sqs", region_name=aws_region, config=SQS_CLIENT_CONFIG
+                )
+                _SQS_CLIENTS[aws_region] = sqs_client
+    return sqs_client
+
+
 # Keys for input schema. Utilized by calling code.
 JOB_ID_KEY = "jobId"
 COLLECTION_ID_KEY = "collectionId"
@@ -109,13 +169,13 @@ def create_status_for_job(
         JOB_ID_KEY: job_id,
         COLLECTION_ID_KEY: collection_id,
         GRANULE_ID_KEY: granule_id,
-        REQUEST_TIME_KEY: datetime.now(timezone.utc).isoformat(),
+        # orjson serializes datetimes to the same string as isoformat().
+        REQUEST_TIME_KEY: datetime.now(timezone.utc),
         ARCHIVE_DESTINATION_KEY: archive_destination,
         FILES_KEY: files,
     }
 
-    message = f"Sending the following data to queue: {new_data}"
-    LOGGER.debug(message)
+    LOGGER.debug("Sending the following data to queue: %s", new_data)
 
     post_entry_to_fifo_queue(new_data, RequestMethod.NEW_JOB, db_queue_url)
 
@@ -143,7 +203,47 @@ def update_status_for_file(
         error_message: message displayed on error.
         db_queue_url: The SQS queue URL defined by AWS.
     """
-    last_update = datetime.now(timezone.utc).isoformat()
+    new_data = build_file_status_update(
+        job_id, collection_id, granule_id, filename, orca_status, error_message
+    )
+
+    LOGGER.debug("Sending the following data to queue: %s", new_data)
+
+    post_entry_to_fifo_queue(new_data, RequestMethod.UPDATE_FILE, db_queue_url)
+
+
+def build_file_status_update(
+    job_id: str,
+    collection_id: str,
+    granule_id: str,
+    filename: str,
+    orca_status: OrcaStatus,
+    error_message: Optional[str],
+    last_update: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Creates update information for a file's status entry.
+    Entries can be posted together with post_entries_to_fifo_queue
+    using RequestMethod.UPDATE_FILE.
+
+    Args:
+        job_id: The unique identifier used for tracking requests.
+        collection_id: The id of the collection containing the collection.
+        granule_id: The id of the granule being restored.
+        filename: The name of the file being copied.
+        orca_status: Defines the status id used in the ORCA Recovery database.
+        error_message: message displayed on error.
+        last_update: The time of the update. Defaults to now.
+            Pass the same time to update several files at once.
+    Returns:
+        A dictionary representing the column/value pairs to write to the DB table.
+    Raises:
+        ValueError: Thrown if orca_status is FAILED and error_message is empty.
+    """
+    # The same timestamp is used for last_update and completion_time.
+    # orjson serializes datetimes to the same string as isoformat().
+    if last_update is None:
+        last_update = datetime.now(timezone.utc)
     new_data = {
         JOB_ID_KEY: job_id,
         COLLECTION_ID_KEY: collection_id,
@@ -153,17 +253,28 @@ def update_status_for_file(
         STATUS_ID_KEY: orca_status.value,
     }
 
-    if orca_status == OrcaStatus.SUCCESS or orca_status == OrcaStatus.FAILED:
-        new_data[COMPLETION_TIME_KEY] = datetime.now(timezone.utc).isoformat()
+    if orca_status in _COMPLETED_STATUSES:
+        new_data[COMPLETION_TIME_KEY] = last_update
         if orca_status == OrcaStatus.FAILED:
-            if error_message is None or len(error_message) == 0:
+            if not error_message:
                 raise ValueError("Error message is required.")
             new_data[ERROR_MESSAGE_KEY] = error_message
 
-    message = f"Sending the following data to queue: {new_data}"
-    LOGGER.debug(message)
+    return new_data
 
-    post_entry_to_fifo_queue(new_data, RequestMethod.UPDATE_FILE, db_queue_url)
+
+def get_deduplication_id(body_bytes: bytes, request_method: RequestMethod) -> str:
+    """
+    Creates the De-duplication ID for a FIFO queue message.
+    The SQS max size is 128 characters, so the body is hashed with sha256 to
+    keep the ID at a fixed 64 characters plus the request method.
+    Args:
+        body_bytes: The utf8 encoded message body.
+        request_method: The action for the database lambda to take when posting to the SQS queue.
+    Returns:
+        The De-duplication ID.
+    """
+    return request_method.value + hashlib.sha256(body_bytes).hexdigest()
 
 
 def post_entry_to_fifo_queue(
@@ -180,37 +291,20 @@ def post_entry_to_fifo_queue(
     Raises:
         None
     """
-    body = json.dumps(new_data)
-
-    # TODO: pass AWS region value to function. SHOULD be gotten from environment
-    # higher up. Setting this to us-west-2 initially since that is where
-    # EOSDIS runs from normally. SEE ORCA-203 https://bugs.earthdata.nasa.ov/browse/ORCA-203
-    LOGGER.debug(f"Creating SQS resource for {db_queue_url}")
-    mysqs_resource = boto3.resource("sqs", region_name=get_aws_region())
-    mysqs = mysqs_resource.Queue(db_queue_url)
-
-    # Create hash for De-duplication ID max size is 128 characters
-    # sha256 will be 64 characters long sha512 is 128 characters
-    deduplication_id = (
-        request_method.value + hashlib.sha256(body.encode("utf8")).hexdigest()
-    )
-
-    md5_body = hashlib.md5(body.encode("utf8")).hexdigest()  # nosec
+    body_bytes = orjson.dumps(new_data)
+    body = body_bytes.decode("utf8")
+    deduplication_id = get_deduplication_id(body_bytes, request_method)
+    md5_body = hashlib.md5(body_bytes).hexdigest()  # nosec
 
-    LOGGER.debug("Sending message to the QUEUE")
-    response = mysqs.send_message(
+    LOGGER.debug("Sending message to the QUEUE %s", db_queue_url)
+    response = get_sqs_client().send_message(
         QueueUrl=db_queue_url,
         MessageDeduplicationId=deduplication_id,
-        MessageGroupId="request_files",
-        MessageAttributes={
-            "RequestMethod": {
-                "DataType": "String",
-                "StringValue": request_method.value,
-            }
-        },
+        MessageGroupId=FIFO_MESSAGE_GROUP_ID,
+        MessageAttributes=_REQUEST_METHOD_ATTRIBUTES[request_method],
         MessageBody=body,
     )
-    LOGGER.debug(f"SQS Message Response: {json.dumps(response)}")
+    LOGGER.debug("SQS Message Response: %s", response)
 
     # Make sure we didn't have an error sending message
     return_status = response["ResponseMetadata"]["HTTPStatusCode"]
@@ -226,6 +320,87 @@ def post_entry_to_fifo_queue(
         )
 
 
+def post_entries_to_fifo_queue(
+    entries: List[Tuple[Dict[str, Any], RequestMethod]],
+    db_queue_url: str,
+) -> None:
+    """
+    Posts multiple messages to SQS FIFO queue, sending up to
+    SQS_MAX_BATCH_SIZE messages per request.
+    Entries SQS reports as failed are resent up to SQS_MAX_BATCH_RETRIES times,
+    without resending the entries in the batch that succeeded.
+    If an error is raised, earlier batches may already have been sent.
+    Posting the same entries again is safe, since resent messages carry the same
+    de-duplication IDs and are dropped by the FIFO queue.
+    Args:
+        entries: A list of tuples with the following values:
+            new_data (Dict): The column/value pairs to write to the DB table.
+            request_method (RequestMethod): The action for the database lambda
+                to take when posting to the SQS queue.
+        db_queue_url: The SQS queue URL defined by AWS.
+    Raises:
+        Exception: Thrown if any message in a batch fails to send.
+    """
+    sqs_client = get_sqs_client()
+    for batch_start in range(0, len(entries), SQS_MAX_BATCH_SIZE):
+        batch_entries = {}
+        md5_bodies = {}
+        for index, (new_data, request_method) in enumerate(
+            entries[batch_start : batch_start + SQS_MAX_BATCH_SIZE]
+        ):
+            body_bytes = orjson.dumps(new_data)
+            body = body_bytes.decode("utf8")
+            entry_id = str(index)
+            md5_bodies[entry_id] = hashlib.md5(body_bytes).hexdigest()  # nosec
+            batch_entries[entry_id] = {
+                "Id": entry_id,
+                "MessageDeduplicationId": get_deduplication_id(
+                    body_bytes, request_method
+                ),
+                "MessageGroupId": FIFO_MESSAGE_GROUP_ID,
+                "MessageAttributes": _REQUEST_METHOD_ATTRIBUTES[request_method],
+                "MessageBody": body,
+            }
+
+        pending_entries = list(batch_entries.values())
+        for attempt in range(SQS_MAX_BATCH_RETRIES + 1):
+            LOGGER.debug(
+                "Sending %d messages to the QUEUE %s",
+                len(pending_entries),
+                db_queue_url,
+            )
+            response = sqs_client.send_message_batch(
+                QueueUrl=db_queue_url, Entries=pending_entries
+            )
+
+            for successful_entry in response.get("Successful", []):
+                md5_body = md5_bodies[successful_entry["Id"]]
+                sqs_md5 = successful_entry.get("MD5OfMessageBody")
+                if md5_body != sqs_md5:
+                    raise Exception(
+                        f"Calculated MD5 of {md5_body} does not match SQS MD5 of {sqs_md5}"
+                    )
+
+            # Make sure we didn't have an error sending any of the messages
+            failed = response.get("Failed", [])
+            if len(failed) == 0:
+                break
+            # Resending will not fix entries SQS rejected as invalid.
+            if attempt == SQS_MAX_BATCH_RETRIES or any(
+                entry.get("SenderFault", False) for entry in failed
+            ):
+                raise Exception(
+                    f"Failed to send {len(failed)} message(s) to Queue. "
+                    f"Errors were {[entry.get('Message') for entry in failed]}"
+                )
+            LOGGER.warning(
+                "Resending %d failed message(s) to the QUEUE %s",
+                len(failed),
+                db_queue_url,
+            )
+            pending_entries = [batch_entries[entry["Id"]] for entry in failed]
+
+
 def post_entry_to_standard_queue(
     new_data: Dict[str, Any],
     recovery_queue_url: str,
@@ -238,23 +413,16 @@ def post_entry_to_standard_queue(
     Raises:
         None
     """
-    body = json.dumps(new_data)
-
-    # TODO: pass AWS region value to function. SHOULD be gotten from environment
-    # higher up. Setting this to us-west-2 initially since that is where
-    # EOSDIS runs from normally. SEE ORCA-203 https://bugs.earthdata.nasa.ov/browse/ORCA-203
-    LOGGER.debug(f"Creating SQS resource for {recovery_queue_url}")
-    mysqs_resource = boto3.resource("sqs", region_name=get_aws_region())
-    mysqs = mysqs_resource.Queue(recovery_queue_url)
-
-    md5_body = hashlib.md5(body.encode("utf8")).hexdigest()  # nosec
+    body_bytes = orjson.dumps(new_data)
+    body = body_bytes.decode("utf8")
+    md5_body = hashlib.md5(body_bytes).hexdigest()  # nosec
 
-    LOGGER.debug("Sending message to the QUEUE")
-    response = mysqs.send_message(
+    LOGGER.debug("Sending message to the QUEUE %s", recovery_queue_url)
+    response = get_sqs_client().send_message(
         QueueUrl=recovery_queue_url,
         MessageBody=body,
     )
-    LOGGER.debug(f"SQS Message Response: {json.dumps(response)}")
+    LOGGER.debug("SQS Message Response: %s", response)
 
     # Make sure we didn't have an error sending message
     return_status = response["ResponseMetadata"]["HTTPStatusCode"]
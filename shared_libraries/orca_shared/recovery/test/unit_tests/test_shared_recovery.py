@@ -2,15 +2,18 @@
 Name: test_shared_recovery.py
 Description: Unit tests for shared_recovery.py shared library.
 """
+import hashlib
 import json
 import os
 import unittest
 import uuid
 from datetime import datetime, timezone
 from unittest import mock
-from unittest.mock import patch
+from unittest.mock import MagicMock, Mock, patch
 
 import boto3
+import orjson
+from botocore.stub import Stubber
 from moto import mock_sqs
 
 from orca_shared.recovery import shared_recovery
@@ -81,6 +84,205 @@ class TestSharedRecoveryLibraries(unittest.TestCase):
                 # Testing SQS body
                 self.assertEqual(queue_output_body, new_data)
 
+    def test_get_deduplication_id_fixed_length(self):
+        """
+        De-duplication IDs should stay within the SQS limit of 128 characters
+        regardless of the size of the body, and differ by request method.
+        """
+        body_bytes = json.dumps({"files": ["a" * 1000] * 100}).encode("utf8")
+        deduplication_ids = set()
+        for request_method in self.request_methods:
+            with self.subTest(request_method=request_method):
+                deduplication_id = shared_recovery.get_deduplication_id(
+                    body_bytes, request_method
+                )
+                self.assertEqual(
+                    deduplication_id,
+                    shared_recovery.get_deduplication_id(body_bytes, request_method),
+                )
+                self.assertTrue(deduplication_id.startswith(request_method.value))
+                self.assertEqual(len(request_method.value) + 64, len(deduplication_id))
+                deduplication_ids.add(deduplication_id)
+        self.assertEqual(len(self.request_methods), len(deduplication_ids))
+
+    @patch.dict(
+        os.environ,
+        {"AWS_REGION": "us-west-2"},
+        clear=True,
+    )
+    def test_post_entries_to_fifo_queue_no_errors(self):
+        """
+        *Happy Path*
+        Test that sending more messages than fit in a single batch using
+        post_entries_to_fifo_queue() delivers every message in order.
+        """
+        fifo_queue = self.test_sqs.create_queue(
+            QueueName="unit-test-queue.fifo", Attributes={"FifoQueue": "true"}
+        )
+        entries = [
+            ({"name": f"test{index}"}, self.request_methods[index % 2])
+            for index in range(shared_recovery.SQS_MAX_BATCH_SIZE + 3)
+        ]
+
+        shared_recovery.post_entries_to_fifo_queue(entries, fifo_queue.url)
+
+        # grabbing queue contents after the messages are sent
+        received = []
+        while True:
+            queue_contents = fifo_queue.receive_messages(
+                MaxNumberOfMessages=10, MessageAttributeNames=["All"]
+            )
+            if len(queue_contents) == 0:
+                break
+            for queue_message in queue_contents:
+                received.append(
+                    (
+                        json.loads(queue_message.body),
+                        queue_message.message_attributes["RequestMethod"][
+                            "StringValue"
+                        ],
+                    )
+                )
+                queue_message.delete()
+
+        self.assertEqual(
+            [(new_data, request_method.value) for new_data, request_method in entries],
+            received,
+        )
+
+    @patch("orca_shared.recovery.shared_recovery.get_sqs_client")
+    def test_post_entries_to_fifo_queue_failed_entries_raise(
+        self, mock_get_sqs_client: MagicMock
+    ):
+        """
+        Entries that SQS reports as failed should raise an error.
+        """
+        error_message = uuid.uuid4().__str__()
+        mock_get_sqs_client.return_value.send_message_batch.return_value = {
+            "Successful": [],
+            "Failed": [{"Id": "0", "SenderFault": True, "Message": error_message}],
+        }
+
+        with self.assertRaises(Exception) as cm:
+            shared_recovery.post_entries_to_fifo_queue(
+                [({"name": "test"}, shared_recovery.RequestMethod.UPDATE_FILE)],
+                self.db_queue_url,
+            )
+        self.assertEqual(
+            f"Failed to send 1 message(s) to Queue. Errors were ['{error_message}']",
+            str(cm.exception),
+        )
+        # Sender faults are not resent.
+        mock_get_sqs_client.return_value.send_message_batch.assert_called_once()
+
+    @patch("orca_shared.recovery.shared_recovery.get_sqs_client")
+    def test_post_entries_to_fifo_queue_resends_only_failed_entries(
+        self, mock_get_sqs_client: MagicMock
+    ):
+        """
+        Entries that fail on the SQS side should be resent on their own,
+        without resending the entries that succeeded.
+        """
+        entries = [
+            ({"name": "test0"}, shared_recovery.RequestMethod.UPDATE_FILE),
+            ({"name": "test1"}, shared_recovery.RequestMethod.UPDATE_FILE),
+        ]
+        md5_bodies = [
+            hashlib.md5(orjson.dumps(new_data)).hexdigest()  # nosec
+            for new_data, _ in entries
+        ]
+        mock_send_message_batch = mock_get_sqs_client.return_value.send_message_batch
+        mock_send_message_batch.side_effect = [
+            {
+                "Successful": [{"Id": "0", "MD5OfMessageBody": md5_bodies[0]}],
+                "Failed": [{"Id": "1", "SenderFault": False, "Message": "Busy"}],
+            },
+            {
+                "Successful": [{"Id": "1", "MD5OfMessageBody": md5_bodies[1]}],
+                "Failed": [],
+            },
+        ]
+
+        shared_recovery.post_entries_to_fifo_queue(entries, self.db_queue_url)
+
+        self.assertEqual(2, mock_send_message_batch.call_count)
+        first_entries = mock_send_message_batch.call_args_list[0].kwargs["Entries"]
+        second_entries = mock_send_message_batch.call_args_list[1].kwargs["Entries"]
+        self.assertEqual(["0", "1"], [entry["Id"] for entry in first_entries])
+        self.assertEqual([first_entries[1]], second_entries)
+
+    @patch("orca_shared.recovery.shared_recovery.get_sqs_client")
+    def test_post_entries_to_fifo_queue_failed_entries_retries_exhausted_raise(
+        self, mock_get_sqs_client: MagicMock
+    ):
+        """
+        Entries that keep failing on the SQS side should raise an error
+        once SQS_MAX_BATCH_RETRIES resends are used up.
+        """
+        error_message = uuid.uuid4().__str__()
+        mock_send_message_batch = mock_get_sqs_client.return_value.send_message_batch
+        mock_send_message_batch.return_value = {
+            "Successful": [],
+            "Failed": [{"Id": "0", "SenderFault": False, "Message": error_message}],
+        }
+
+        with self.assertRaises(Exception) as cm:
+            shared_recovery.post_entries_to_fifo_queue(
+                [({"name": "test"}, shared_recovery.RequestMethod.UPDATE_FILE)],
+                self.db_queue_url,
+            )
+        self.assertEqual(
+            f"Failed to send 1 message(s) to Queue. Errors were ['{error_message}']",
+            str(cm.exception),
+        )
+        self.assertEqual(
+            shared_recovery.SQS_MAX_BATCH_RETRIES + 1,
+            mock_send_message_batch.call_count,
+        )
+
+    @patch("orca_shared.recovery.shared_recovery.get_sqs_client")
+    def test_post_entry_to_fifo_queue_sends_one_message(
+        self, mock_get_sqs_client: MagicMock
+    ):
+        """
+        Each post should result in exactly one SendMessage call to SQS.
+        """
+        new_data = {"name": "test"}
+        request_method = shared_recovery.RequestMethod.NEW_JOB
+        body_bytes = orjson.dumps(new_data)
+        sqs_client = boto3.client("sqs", region_name="us-west-2")
+        mock_get_sqs_client.return_value = sqs_client
+
+        with Stubber(sqs_client) as stubber:
+            stubber.add_response(
+                "send_message",
+                {
+                    "MD5OfMessageBody": hashlib.md5(body_bytes).hexdigest(),  # nosec
+                    "MessageId": uuid.uuid4().__str__(),
+                    "ResponseMetadata": {"HTTPStatusCode": 200},
+                },
+                {
+                    "QueueUrl": self.db_queue_url,
+                    "MessageDeduplicationId": shared_recovery.get_deduplication_id(
+                        body_bytes, request_method
+                    ),
+                    "MessageGroupId": self.MessageGroupId,
+                    "MessageAttributes": {
+                        "RequestMethod": {
+                            "DataType": "String",
+                            "StringValue": request_method.value,
+                        }
+                    },
+                    "MessageBody": body_bytes.decode("utf8"),
+                },
+            )
+
+            shared_recovery.post_entry_to_fifo_queue(
+                new_data, request_method, self.db_queue_url
+            )
+
+            stubber.assert_no_pending_responses()
+
     @patch.dict(
         os.environ,
         {"AWS_REGION": "us-west-2"},
@@ -103,6 +305,56 @@ class TestSharedRecoveryLibraries(unittest.TestCase):
         # Testing SQS body
         self.assertEqual(queue_output_body, new_data)
 
+    @patch.dict(
+        os.environ,
+        {"AWS_REGION": "us-west-2"},
+        clear=True,
+    )
+    @patch.dict(shared_recovery._SQS_CLIENTS, clear=True)
+    @patch("boto3.client")
+    def test_get_sqs_client_reuses_client(self, mock_boto3_client: MagicMock):
+        """
+        The SQS client should only be created once per region and then reused.
+        """
+        first_client = shared_recovery.get_sqs_client()
+        second_client = shared_recovery.get_sqs_client()
+
+        mock_boto3_client.assert_called_once_with(
+            "sqs", region_name="us-west-2", config=shared_recovery.SQS_CLIENT_CONFIG
+        )
+        self.assertEqual(mock_boto3_client.return_value, first_client)
+        self.assertEqual(first_client, second_client)
+
+    @patch("orca_shared.recovery.shared_recovery.get_sqs_client")
+    def test_post_entry_to_fifo_queue_uses_current_client(
+        self, mock_get_sqs_client: MagicMock
+    ):
+        """
+        Each post should send with the client get_sqs_client returns at the time,
+        so a replaced client is picked up.
+        """
+        new_data = {"name": "test"}
+        body_bytes = orjson.dumps(new_data)
+        request_method = shared_recovery.RequestMethod.UPDATE_FILE
+        first_client = Mock()
+        second_client = Mock()
+        for sqs_client in [first_client, second_client]:
+            sqs_client.send_message.return_value = {
+                "ResponseMetadata": {"HTTPStatusCode": 200},
+                "MD5OfMessageBody": hashlib.md5(body_bytes).hexdigest(),  # nosec
+            }
+        mock_get_sqs_client.side_effect = [first_client, second_client]
+
+        shared_recovery.post_entry_to_fifo_queue(
+            new_data, request_method, self.db_queue_url
+        )
+        shared_recovery.post_entry_to_fifo_queue(
+            new_data, request_method, self.db_queue_url
+        )
+
+        first_client.send_message.assert_called_once()
+        second_client.send_message.assert_called_once()
+
     @patch.dict(
         os.environ,
         {"AWS_REGION": "us-west-2"},
@@ -226,6 +478,10 @@ class TestSharedRecoveryLibraries(unittest.TestCase):
                         queue_output_body[shared_recovery.COMPLETION_TIME_KEY]
                     )
                     self.assertEqual(timezone.utc, new_completion_time.tzinfo)
+                    self.assertEqual(
+                        queue_output_body[shared_recovery.LAST_UPDATE_KEY],
+                        queue_output_body[shared_recovery.COMPLETION_TIME_KEY],
+                    )
                 else:
                     self.assertNotIn(
                         shared_recovery.COMPLETION_TIME_KEY, queue_output_body
@@ -240,6 +496,63 @@ class TestSharedRecoveryLibraries(unittest.TestCase):
                         shared_recovery.ERROR_MESSAGE_KEY, queue_output_body
                     )
 
+    def test_build_file_status_update_sets_fields_by_status(self):
+        """
+        Completion time should only be set for completed statuses,
+        and the error message only for failed statuses.
+        """
+        error_message = uuid.uuid4().__str__()
+        for status_id in self.statuses:
+            with self.subTest(status_id=status_id):
+                new_data = shared_recovery.build_file_status_update(
+                    self.job_id,
+                    "collection",
+                    self.granule_id,
+                    "f1.doc",
+                    status_id,
+                    error_message,
+                )
+
+                self.assertEqual(self.job_id, new_data[shared_recovery.JOB_ID_KEY])
+                self.assertEqual("f1.doc", new_data[shared_recovery.FILENAME_KEY])
+                self.assertEqual(
+                    status_id.value, new_data[shared_recovery.STATUS_ID_KEY]
+                )
+                if status_id in [
+                    shared_recovery.OrcaStatus.SUCCESS,
+                    shared_recovery.OrcaStatus.FAILED,
+                ]:
+                    self.assertEqual(
+                        new_data[shared_recovery.LAST_UPDATE_KEY],
+                        new_data[shared_recovery.COMPLETION_TIME_KEY],
+                    )
+                else:
+                    self.assertNotIn(shared_recovery.COMPLETION_TIME_KEY, new_data)
+                if status_id == shared_recovery.OrcaStatus.FAILED:
+                    self.assertEqual(
+                        error_message, new_data[shared_recovery.ERROR_MESSAGE_KEY]
+                    )
+                else:
+                    self.assertNotIn(shared_recovery.ERROR_MESSAGE_KEY, new_data)
+
+    def test_build_file_status_update_uses_given_last_update(self):
+        """
+        A given last_update should be used for both timestamps.
+        """
+        last_update = datetime.now(timezone.utc)
+        new_data = shared_recovery.build_file_status_update(
+            self.job_id,
+            "collection",
+            self.granule_id,
+            "f1.doc",
+            shared_recovery.OrcaStatus.FAILED,
+            uuid.uuid4().__str__(),
+            last_update,
+        )
+
+        self.assertIs(last_update, new_data[shared_recovery.LAST_UPDATE_KEY])
+        self.assertIs(last_update, new_data[shared_recovery.COMPLETION_TIME_KEY])
+
     def test_update_status_for_file_error_message_empty_raises_error_message(self):
         """
         Tests that update_status_for_file will raise a ValueError
@@ -262,3 +575,42 @@ class TestSharedRecoveryLibraries(unittest.TestCase):
                     uuid.uuid4().__str__(),
                 )
             self.assertEqual("Error message is required.", str(cm.exception))
+
+    @patch("orca_shared.recovery.shared_recovery.post_entry_to_fifo_queue")
+    def test_status_functions_post_with_request_method(
+        self, mock_post_entry_to_fifo_queue: MagicMock
+    ):
+        """
+        Tests that create_status_for_job and update_status_for_file post with
+        the NEW_JOB and UPDATE_FILE request methods respectively.
+        """
+        shared_recovery.create_status_for_job(
+            self.job_id,
+            uuid.uuid4().__str__(),
+            self.granule_id,
+            "archive-bucket",
+            [],
+            self.db_queue_url,
+        )
+        shared_recovery.update_status_for_file(
+            self.job_id,
+            uuid.uuid4().__str__(),
+            self.granule_id,
+            "f1.doc",
+            shared_recovery.OrcaStatus.STAGED,
+            None,
+            self.db_queue_url,
+        )
+
+        self.assertEqual(
+            [
+                shared_recovery.RequestMethod.NEW_JOB,
+                shared_recovery.RequestMethod.UPDATE_FILE,
+            ],
+            [
+                call_args.args[1]
+                for call_args in mock_post_entry_to_fifo_queue.call_args_list
+            ],
+        )
+        for call_args in mock_post_entry_to_fifo_queue.call_args_list:
+            self.assertEqual(self.db_queue_url, call_args.args[2])
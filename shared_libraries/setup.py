@@ -34,6 +34,7 @@ install_requirements = ["aws_lambda_powertools==1.31.0"]
 # Additional library dependencies
 _dep_boto3 = "boto3~=1.18.40"
 _dep_sqlalchemy = "SQLAlchemy~=2.0.5"
+_dep_orjson = "orjson~=3.8.3"
 
 
 # Get all the libraries available in the orca_shared space
@@ -46,7 +47,7 @@ for library_name in [
 
 # Update with library specific requirements
 extras_per_library.update(
-    {"database": [_dep_boto3, _dep_sqlalchemy], "recovery": [_dep_boto3], "reconciliation": []}
+    {"database": [_dep_boto3, _dep_sqlalchemy], "recovery": [_dep_boto3, _dep_orjson], "reconciliation": []}
 )
 
 
@@ -235,7 +235,7 @@ def task(task_input: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
     for granule in task_input["granules"]:
         # noinspection PyPep8Naming
         granuleId = granule["granuleId"]
-        if granuleId not in granule_data.keys():
+        if granuleId not in granule_data:
             granule_data[granuleId] = {"granuleId": granuleId, "files": []}
         # populate the SQS body for granules
         sqs_body["granule"]["cumulusGranuleId"] = granuleId
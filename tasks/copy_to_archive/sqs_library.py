@@ -9,6 +9,7 @@ import hashlib
 import json
 import os
 import random
+import threading
 import time
 from typing import Any, Callable, Dict, TypeVar
 
@@ -16,6 +17,7 @@ from typing import Any, Callable, Dict, TypeVar
 import boto3
 import fastjsonschema
 from aws_lambda_powertools import Logger
+from boto3.resources.base import ServiceResource
 
 # Set AWS powertools logger
 LOGGER = Logger()
@@ -25,6 +27,12 @@ BACKOFF_FACTOR = 2  # Value of the factor used to backoff
 INITIAL_BACKOFF_IN_SECONDS = 1  # Number of seconds to sleep the first time through.
 RT = TypeVar("RT")  # return type
 
+# SQS resources by region. Kept at module level so warm lambda invocations
+# reuse the resource instead of rebuilding it.
+_RESOURCES: Dict[str, ServiceResource] = {}
+# Creating resources from the default boto3 session is not thread safe.
+_RESOURCES_LOCK = threading.Lock()
+
 try:
     with open("schemas/body.json", "r") as raw_schema:
         _BODY_VALIDATE = fastjsonschema.compile(json.loads(raw_schema.read()))
@@ -113,6 +121,27 @@ def get_aws_region() -> str:
     return aws_region
 
 
+def get_sqs_resource(region_name: str) -> ServiceResource:
+    """
+    Gets the SQS resource for the given region, creating it on first use.
+    Creation is locked, since the default boto3 session is not thread safe.
+    Once created, the resource may be shared across threads.
+        Args:
+            region_name: The AWS region the queue is in.
+        Returns:
+            A boto3 SQS resource.
+    """
+    resource = _RESOURCES.get(region_name, None)
+    if resource is None:
+        with _RESOURCES_LOCK:
+            resource = _RESOURCES.get(region_name, None)
+            if resource is None:
+                LOGGER.debug(f"Creating SQS resource for {region_name}")
+                resource = boto3.resource("sqs", region_name=region_name)
+                _RESOURCES[region_name] = resource
+    return resource
+
+
 @retry_error()
 def post_to_metadata_queue(
     sqs_body: Dict[str, Any],
@@ -128,11 +157,9 @@ def post_to_metadata_queue(
     """
     LOGGER.debug("Validating the SQS message body with the schema.")
     _BODY_VALIDATE(sqs_body)
-    body = json.dumps(sqs_body)
-    LOGGER.debug(
-        f"Creating SQS resource for {metadata_queue_url}",
-    )
-    mysqs_resource = boto3.resource("sqs", region_name=get_aws_region())
+    # Compact separators keep the message, and the bytes hashed for its ids, small.
+    body = json.dumps(sqs_body, separators=(",", ":"))
+    mysqs_resource = get_sqs_resource(get_aws_region())
     mysqs = mysqs_resource.Queue(metadata_queue_url)
     deduplication_id = hashlib.sha256(body.encode("utf8")).hexdigest()
 
@@ -106,6 +106,7 @@ class TestCopyToArchive(TestCase):
         Perform initial setup for the tests.
         """
         self.mock_sqs.start()
+        sqs_library._RESOURCES.clear()
         self.test_sqs = boto3.resource("sqs", region_name="us-west-2")
         self.queue = self.test_sqs.create_queue(QueueName="test-metadata-queue")
         self.metadata_queue_url = self.queue.url
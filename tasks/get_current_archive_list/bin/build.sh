@@ -79,6 +79,11 @@ echo "INFO: Copying schema files ..."
 cp -r schemas/ build/
 check_returncode $? "ERROR: Failed to copy schema files to build directory."
 
+## Generate the schema validators so they are not compiled on cold start
+echo "INFO: Generating schema validators ..."
+PYTHONPATH=build python bin/compile_schemas.py build/schemas
+check_returncode $? "ERROR: Failed to generate schema validators."
+
 ## Create the zip archive
 cd build
 trap 'cd -;deactivate_and_delete_venv;rm -rf build;' EXIT
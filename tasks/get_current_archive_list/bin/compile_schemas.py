@@ -0,0 +1,50 @@
+"""
+Name: compile_schemas.py
+
+Description: Generates python validator modules from the lambda's schema files
+so the validators do not need to be compiled when the lambda cold starts.
+
+Usage: python bin/compile_schemas.py <schema directory>
+    Writes _<schema name>_validator.py next to each <schema name>.json file.
+    Each module exposes a `validate` function.
+"""
+import json
+import os
+import re
+import sys
+
+import fastjsonschema
+
+
+def compile_schema(schema_path: str, module_path: str) -> None:
+    """
+    Generates the validator module for a single schema file.
+
+    Args:
+        schema_path: Path to the json schema file.
+        module_path: Path to write the generated python module to.
+    """
+    with open(schema_path, "r") as raw_schema:
+        code = fastjsonschema.compile_to_code(json.loads(raw_schema.read()))
+
+    # The generated function is named after the schema $id. Expose it under a
+    # fixed name for the lambda to import.
+    validator_name = re.search(r"^def (\w+)\(", code, re.MULTILINE).group(1)
+    with open(module_path, "w") as module:
+        module.write(code)
+        module.write(f"\n\nvalidate = {validator_name}\n")
+
+
+def main(schema_directory: str) -> None:
+    for file_name in sorted(os.listdir(schema_directory)):
+        schema_name, extension = os.path.splitext(file_name)
+        if extension != ".json":
+            continue
+        compile_schema(
+            os.path.join(schema_directory, file_name),
+            os.path.join(schema_directory, f"_{schema_name}_validator.py"),
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
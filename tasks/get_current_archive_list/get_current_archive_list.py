@@ -4,9 +4,12 @@ Name: get_current_archive_list.py
 Description: Receives a list of s3 events from an SQS queue,
 and loads the s3 inventory specified into postgres.
 """
+import functools
 import json
 import os
 import os.path
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, List
@@ -17,6 +20,8 @@ import fastjsonschema as fastjsonschema
 import orca_shared.reconciliation.shared_reconciliation
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.client import BaseClient
+from fastjsonschema import JsonSchemaException
 from orca_shared.database import shared_db
 from orca_shared.reconciliation import (
     OrcaStatus,
@@ -24,7 +29,7 @@ from orca_shared.reconciliation import (
     update_job,
 )
 from sqlalchemy import text
-from sqlalchemy.future import Engine
+from sqlalchemy.future import Connection, Engine
 
 OS_ENVIRON_INTERNAL_REPORT_QUEUE_URL_KEY = "INTERNAL_REPORT_QUEUE_URL"
 OS_ENVIRON_S3_CREDENTIALS_SECRET_ARN_KEY = "S3_CREDENTIALS_SECRET_ARN"  # nosec
@@ -48,18 +53,33 @@ OUTPUT_JOB_ID_KEY = "jobId"
 OUTPUT_ORCA_ARCHIVE_LOCATION_KEY = "orcaArchiveLocation"
 OUTPUT_RECEIPT_HANDLE_KEY = "messageReceiptHandle"
 
+# Maximum number of csv files to update metadata for at once.
+MAX_METADATA_WORKERS = 8
+
+# boto3 clients by service name. Kept at module level so warm lambda invocations
+# reuse the client instead of rebuilding it.
+_CLIENTS: Dict[str, BaseClient] = {}
+# Creating clients from the default boto3 session is not thread safe.
+_CLIENTS_LOCK = threading.Lock()
+
 # Set AWS powertools logger
 LOGGER = Logger()
 
 # Generating schema validators can take time, so do it once and reuse.
+# bin/build.sh generates the validators ahead of time with bin/compile_schemas.py.
+# Outside of a build, compile them from the schema files.
 try:
-    with open("schemas/input.json", "r") as raw_schema:
-        _INPUT_VALIDATE = fastjsonschema.compile(json.loads(raw_schema.read()))
-    with open("schemas/output.json", "r") as raw_schema:
-        _OUTPUT_VALIDATE = fastjsonschema.compile(json.loads(raw_schema.read()))
-except Exception as ex:
-    LOGGER.error(f"Could not build schema validator: {ex}")
-    raise
+    from schemas._input_validator import validate as _INPUT_VALIDATE
+    from schemas._output_validator import validate as _OUTPUT_VALIDATE
+except ImportError:
+    try:
+        with open("schemas/input.json", "r") as raw_schema:
+            _INPUT_VALIDATE = fastjsonschema.compile(json.loads(raw_schema.read()))
+        with open("schemas/output.json", "r") as raw_schema:
+            _OUTPUT_VALIDATE = fastjsonschema.compile(json.loads(raw_schema.read()))
+    except Exception as ex:
+        LOGGER.error(f"Could not build schema validator: {ex}")
+        raise
 
 
 def task(
@@ -117,10 +137,9 @@ def task(
     )
 
     try:
-        # noinspection PyArgumentList
-        truncate_s3_partition(manifest[MANIFEST_SOURCE_BUCKET_KEY], admin_engine)
         # noinspection PyArgumentList
         update_job_with_s3_inventory_in_postgres(
+            manifest[MANIFEST_SOURCE_BUCKET_KEY],
             s3_access_key,
             s3_secret_key,
             report_bucket_name,
@@ -205,48 +224,55 @@ def create_job(
             for sql_result in rows.mappings():
                 job_id = sql_result["id"]
     except Exception as sql_ex:
-        LOGGER.error(f"Error while creating job: {sql_ex}")
+        LOGGER.exception("Error while creating job: %s", sql_ex)
         raise
 
     return job_id
 
 
+# Statements without dynamic identifiers are built once and reused by their
+# *_sql functions.
+_CREATE_JOB_SQL = text(
+    """
+    INSERT INTO reconcile_job
+        ("orca_archive_location", "inventory_creation_time",
+        "status_id", "start_time", "last_update", "end_time",
+        "error_message")
+    VALUES
+        (:orca_archive_location, :inventory_creation_time,
+        :status_id, :start_time, :last_update, :end_time,
+        :error_message)
+    RETURNING
+        id"""
+)
+
+
 def create_job_sql() -> text:  # pragma: no cover
-    return text(
-        """
-        INSERT INTO reconcile_job
-            ("orca_archive_location", "inventory_creation_time",
-            "status_id", "start_time", "last_update", "end_time",
-            "error_message")
-        VALUES
-            (:orca_archive_location, :inventory_creation_time,
-            :status_id, :start_time, :last_update, :end_time,
-            :error_message)
-        RETURNING
-            id"""
-    )
+    return _CREATE_JOB_SQL
 
 
-@shared_db.retry_operational_error()
-def truncate_s3_partition(orca_archive_location: str, engine: Engine) -> None:
+def truncate_s3_partition(orca_archive_location: str, connection: Connection) -> None:
     """
     Truncates the partition for the given orca_archive_location, removing its data.
+    Runs within the caller's transaction, so the truncate is only committed
+    alongside the new inventory data.
+    TRUNCATE takes an ACCESS EXCLUSIVE lock on the partition,
+    which is held until the caller's transaction ends.
 
     Args:
         orca_archive_location: The name of the bucket to generate the reports for.
-        engine: The sqlalchemy engine to use for contacting the database.
+        connection: The sqlalchemy connection to use for contacting the database.
     """
     try:
         LOGGER.debug(f"Truncating old s3 data for bucket {orca_archive_location}.")
         partition_name = get_partition_name_from_bucket_name(orca_archive_location)
-        with engine.begin() as connection:
-            connection.execute(
-                truncate_s3_partition_sql(partition_name),
-                [{}],
-            )
+        connection.execute(
+            truncate_s3_partition_sql(partition_name),
+            [{}],
+        )
     except Exception as sql_ex:
-        LOGGER.error(
-            f"Error while truncating bucket '{orca_archive_location}': {sql_ex}"
+        LOGGER.exception(
+            "Error while truncating bucket '%s': %s", orca_archive_location, sql_ex
         )
         raise
 
@@ -262,6 +288,7 @@ def truncate_s3_partition_sql(partition_name: str) -> text:
 
 @shared_db.retry_operational_error()
 def update_job_with_s3_inventory_in_postgres(
+    orca_archive_location: str,
     s3_access_key: str,
     s3_secret_key: str,
     report_bucket_name: str,
@@ -272,10 +299,19 @@ def update_job_with_s3_inventory_in_postgres(
     engine: Engine,
 ) -> None:
     """
-    Constructs a temporary table capable of holding full data from s3 inventory report,
+    Adds missing metadata to the csvs, then truncates the old data in the partition,
+    constructs a temporary table capable of holding full data from s3 inventory report,
     triggers load into that table, then moves that data into the proper partition.
+    All database operations are performed in a single transaction,
+    which is only opened once the S3 metadata is in place.
+    The truncate's ACCESS EXCLUSIVE lock on the partition is held through the
+    import from S3 and the translation into the partition, so readers of
+    reconcile_s3_object for this location wait for the load to finish.
+    This is accepted so that readers, such as perform_orca_reconcile,
+    never see an empty or partially loaded inventory.
 
     Args:
+        orca_archive_location: The name of the bucket to generate the reports for.
         s3_access_key: The access key that, when paired with s3_secret_key,
         allows postgres to access s3.
         s3_secret_key: The secret key that, when paired with s3_access_key,
@@ -292,30 +328,51 @@ def update_job_with_s3_inventory_in_postgres(
         temporary_s3_column_list = generate_temporary_s3_column_list(
             manifest_file_schema
         )
+        csv_load_parameters = []
+        for csv_key_path in csv_key_paths:
+            if not csv_key_path.endswith(".csv.gz"):
+                raise Exception(f"Cannot handle file extension on '{csv_key_path}'")
+            csv_load_parameters.append(
+                {
+                    "report_bucket_name": report_bucket_name,
+                    "csv_key_path": csv_key_path,
+                    "report_bucket_region": report_bucket_region,
+                    "s3_access_key": s3_access_key,
+                    "s3_secret_key": s3_secret_key,
+                }
+            )
+        # Set the required metadata before opening the transaction,
+        # so the partition is not locked during S3 calls.
+        if len(csv_key_paths) == 1:
+            add_metadata_to_gzip(report_bucket_name, csv_key_paths[0])
+        elif len(csv_key_paths) > 1:
+            # Each file is a separate S3 copy, so run them concurrently.
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_METADATA_WORKERS, len(csv_key_paths))
+            ) as executor:
+                # list() re-raises any exception from the workers.
+                list(
+                    executor.map(
+                        functools.partial(add_metadata_to_gzip, report_bucket_name),
+                        csv_key_paths,
+                    )
+                )
         with engine.begin() as connection:
-            # Within this transaction import the csv and update the job status
+            # Within this transaction clear old data, import the csv,
+            # and update the job status
+            truncate_s3_partition(orca_archive_location, connection)
             connection.execute(
                 create_temporary_table_sql(temporary_s3_column_list),
                 [{}],
             )
-            for csv_key_path in csv_key_paths:
-                if not csv_key_path.endswith(".csv.gz"):
-                    raise Exception(f"Cannot handle file extension on '{csv_key_path}'")
-                # Set the required metadata
-                add_metadata_to_gzip(report_bucket_name, csv_key_path)
-                # Have postgres load the csv
-                LOGGER.debug(f"Loading CSV {csv_key_path} for job {job_id}.")
+            if len(csv_load_parameters) > 0:
+                # Have postgres load all csvs in a single executemany call
+                LOGGER.debug(
+                    f"Loading {len(csv_load_parameters)} CSVs for job {job_id}."
+                )
                 connection.execute(
                     trigger_csv_load_from_s3_sql(),
-                    [
-                        {
-                            "report_bucket_name": report_bucket_name,
-                            "csv_key_path": csv_key_path,
-                            "report_bucket_region": report_bucket_region,
-                            "s3_access_key": s3_access_key,
-                            "s3_secret_key": s3_secret_key,
-                        }
-                    ],
+                    csv_load_parameters,
                 )
             # Now that all csvs are loaded, pull them into main db from temporary table
             LOGGER.debug(f"Translating data to Orca format for job {job_id}.")
@@ -336,10 +393,29 @@ def update_job_with_s3_inventory_in_postgres(
                 engine,
             )
     except Exception as sql_ex:
-        LOGGER.error(f"Error while processing job '{job_id}': {sql_ex}")
+        LOGGER.exception("Error while processing job '%s': %s", job_id, sql_ex)
         raise
 
 
+def get_s3_client() -> BaseClient:
+    """
+    Gets the S3 client, creating it on first use.
+    Creation is locked, since the default boto3 session is not thread safe.
+    Once created, the client may be shared across threads.
+        Returns:
+            A boto3 S3 client.
+    """
+    s3_client = _CLIENTS.get("s3", None)
+    if s3_client is None:
+        with _CLIENTS_LOCK:
+            s3_client = _CLIENTS.get("s3", None)
+            if s3_client is None:
+                LOGGER.debug("Creating S3 client.")
+                s3_client = boto3.client("s3")
+                _CLIENTS["s3"] = s3_client
+    return s3_client
+
+
 def add_metadata_to_gzip(report_bucket_name: str, gzip_key_path: str) -> None:
     """
     AWS does not add proper metadata to gzip files, which breaks aws_s3.table_import_from_s3
@@ -348,13 +424,15 @@ def add_metadata_to_gzip(report_bucket_name: str, gzip_key_path: str) -> None:
         report_bucket_name: The name of the bucket the csv is located in.
         gzip_key_path: The path within the bucket to the gzip file that needs metadata updated.
     """
-    s3 = boto3.resource("s3")
-    s3_object = s3.Object(report_bucket_name, gzip_key_path)
+    s3_client = get_s3_client()
+    s3_object = s3_client.head_object(Bucket=report_bucket_name, Key=gzip_key_path)
     # Only add if needed.
-    if s3_object.content_encoding is None:
-        s3_object.copy_from(
+    if s3_object.get("ContentEncoding") is None:
+        s3_client.copy_object(
+            Bucket=report_bucket_name,
+            Key=gzip_key_path,
             CopySource={"Bucket": report_bucket_name, "Key": gzip_key_path},
-            Metadata=s3_object.metadata,
+            Metadata=s3_object["Metadata"],
             MetadataDirective="REPLACE",
             ContentEncoding="gzip",
         )
@@ -416,66 +494,72 @@ def create_temporary_table_sql(temporary_s3_column_list: str) -> text:
     )
 
 
+_TRIGGER_CSV_LOAD_FROM_S3_SQL = text(
+    # table_name
+    # column_list
+    # options
+    # bucket
+    # file_path
+    # aws region
+    # access_key
+    # secret_key
+    # session_token
+    """
+    SELECT aws_s3.table_import_from_s3(
+        's3_import',
+        '',
+        '(format csv, FORCE_NULL(size_in_bytes))',
+        :report_bucket_name,
+        :csv_key_path,
+        :report_bucket_region,
+        :s3_access_key,
+        :s3_secret_key,
+        ''
+    )
+    """
+)
+
+
 def trigger_csv_load_from_s3_sql() -> text:  # pragma: no cover
     """
     SQL for telling postgres where/how to copy in the s3 inventory data.
     """
-    return text(
-        # table_name
-        # column_list
-        # options
-        # bucket
-        # file_path
-        # aws region
-        # access_key
-        # secret_key
-        # session_token
-        """
-        SELECT aws_s3.table_import_from_s3(
-            's3_import',
-            '',
-            '(format csv, FORCE_NULL(size_in_bytes))',
-            :report_bucket_name,
-            :csv_key_path,
-            :report_bucket_region,
-            :s3_access_key,
-            :s3_secret_key,
-            ''
-        )
-        """
-    )
+    return _TRIGGER_CSV_LOAD_FROM_S3_SQL
 
 
-def translate_s3_import_to_partitioned_data_sql() -> text:  # pragma: no cover
+_TRANSLATE_S3_IMPORT_TO_PARTITIONED_DATA_SQL = text(
     """
-    SQL for translating between the temporary table and Orca table.
-    """
-    return text(
-        """
-        INSERT INTO orca.reconcile_s3_object (
-                job_id,
-                orca_archive_location,
-                key_path,
-                etag,
-                last_update,
-                size_in_bytes,
-                storage_class,
-                delete_marker)
-            SELECT
-            :job_id,
+    INSERT INTO orca.reconcile_s3_object (
+            job_id,
             orca_archive_location,
             key_path,
-            CONCAT('"', etag, '"') as etag, /* copy_to_archive's AWS call presently
-                wraps this in quotes. Seems like a bug, but is shown on
-                https://boto3.amazonaws.com/v1/documentation/api/latest/
-                reference/services/s3.html#S3.Client.list_object_versions */
+            etag,
             last_update,
-            COALESCE(size_in_bytes, 0),
-            storage_class, delete_marker
-            FROM s3_import
-            WHERE is_latest = TRUE
-        """  # nosec    # noqa
-    )
+            size_in_bytes,
+            storage_class,
+            delete_marker)
+        SELECT
+        :job_id,
+        orca_archive_location,
+        key_path,
+        CONCAT('"', etag, '"') as etag, /* copy_to_archive's AWS call presently
+            wraps this in quotes. Seems like a bug, but is shown on
+            https://boto3.amazonaws.com/v1/documentation/api/latest/
+            reference/services/s3.html#S3.Client.list_object_versions */
+        last_update,
+        COALESCE(size_in_bytes, 0),
+        storage_class, delete_marker
+        FROM s3_import
+        WHERE is_latest = TRUE
+    """  # nosec    # noqa
+)
+
+
+def translate_s3_import_to_partitioned_data_sql() -> text:  # pragma: no cover
+    """
+    SQL for translating between the temporary table and Orca table.
+    """
+    return _TRANSLATE_S3_IMPORT_TO_PARTITIONED_DATA_SQL
 
 
 def get_s3_credentials_from_secrets_manager(s3_credentials_secret_arn: str) -> tuple:
@@ -544,16 +628,20 @@ def get_message_from_queue(
         QueueUrl=internal_report_queue_url,
         MaxNumberOfMessages=1,
     )
-    if MESSAGES_KEY not in sqs_response.keys():
+    if MESSAGES_KEY not in sqs_response:
         raise Exception("No messages in queue.")
     message = sqs_response[MESSAGES_KEY][0]
     record = json.loads(message["Body"])
-    _INPUT_VALIDATE(record)
+    try:
+        _INPUT_VALIDATE(record)
+    except JsonSchemaException as json_schema_exception:
+        LOGGER.error(json_schema_exception)
+        raise
     return MessageData(
-        record[RECORD_REPORT_BUCKET_REGION_KEY],
-        record[RECORD_REPORT_BUCKET_NAME_KEY],
-        record[RECORD_MANIFEST_KEY_KEY],
-        message["ReceiptHandle"],
+        report_bucket_region=record[RECORD_REPORT_BUCKET_REGION_KEY],
+        report_bucket_name=record[RECORD_REPORT_BUCKET_NAME_KEY],
+        manifest_key=record[RECORD_MANIFEST_KEY_KEY],
+        message_receipt_handle=message["ReceiptHandle"],
     )
 
 
@@ -619,5 +707,9 @@ def handler(event: Dict[str, List], context: LambdaContext) -> Dict[str, Any]:
         db_connect_info,
     )
     result[OUTPUT_RECEIPT_HANDLE_KEY] = message_data.message_receipt_handle
-    _OUTPUT_VALIDATE(result)
+    try:
+        _OUTPUT_VALIDATE(result)
+    except JsonSchemaException as json_schema_exception:
+        LOGGER.error(json_schema_exception)
+        raise
     return result
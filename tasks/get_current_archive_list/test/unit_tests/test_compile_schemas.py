@@ -0,0 +1,88 @@
+"""
+Name: test_compile_schemas.py
+
+Description:  Unit tests for bin/compile_schemas.py.
+"""
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+from types import ModuleType
+
+from fastjsonschema import JsonSchemaException
+
+TASK_DIRECTORY = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+def load_module(name: str, path: str) -> ModuleType:
+    """
+    Imports the python file at the given path as a module.
+    """
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+compile_schemas = load_module(
+    "compile_schemas", os.path.join(TASK_DIRECTORY, "bin", "compile_schemas.py")
+)
+
+
+class TestCompileSchemas(unittest.TestCase):
+    """
+    TestCompileSchemas.
+    """
+
+    def setUp(self):
+        self.schema_directory = tempfile.mkdtemp()
+        shutil.copytree(
+            os.path.join(TASK_DIRECTORY, "schemas"),
+            self.schema_directory,
+            dirs_exist_ok=True,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.schema_directory)
+
+    def test_main_generates_input_validator(self):
+        """
+        The generated input validator should be importable under the name
+        get_current_archive_list uses, and should enforce the input schema.
+        """
+        compile_schemas.main(self.schema_directory)
+
+        validator = load_module(
+            "_input_validator",
+            os.path.join(self.schema_directory, "_input_validator.py"),
+        )
+
+        valid_input = {
+            "reportBucketRegion": "us-west-2",
+            "reportBucketName": "report-bucket",
+            "manifestKey": "inventory/manifest.json",
+        }
+        validator.validate(valid_input)
+        with self.assertRaises(JsonSchemaException):
+            validator.validate(
+                {"reportBucketRegion": "us-west-2", "reportBucketName": 1}
+            )
+
+    def test_main_generates_output_validator(self):
+        """
+        The generated output validator should be importable under the name
+        get_current_archive_list uses, and should enforce the output schema.
+        """
+        compile_schemas.main(self.schema_directory)
+
+        validator = load_module(
+            "_output_validator",
+            os.path.join(self.schema_directory, "_output_validator.py"),
+        )
+
+        validator.validate({"jobId": 1, "orcaArchiveLocation": "orca-bucket"})
+        with self.assertRaises(JsonSchemaException):
+            validator.validate({"jobId": "1", "orcaArchiveLocation": "orca-bucket"})
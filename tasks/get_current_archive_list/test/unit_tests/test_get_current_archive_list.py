@@ -8,8 +8,10 @@ import datetime
 import json
 import os
 import random
+import time
 import unittest
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, Mock, call, patch
 
 from orca_shared.reconciliation import OrcaStatus
@@ -25,7 +27,6 @@ class TestGetCurrentArchiveList(
     """
 
     @patch("get_current_archive_list.update_job_with_s3_inventory_in_postgres")
-    @patch("get_current_archive_list.truncate_s3_partition")
     @patch("get_current_archive_list.get_manifest")
     @patch("get_current_archive_list.create_job")
     @patch("orca_shared.database.shared_db.get_admin_connection")
@@ -36,7 +37,6 @@ class TestGetCurrentArchiveList(
         mock_get_admin_connection: MagicMock,
         mock_create_job: MagicMock,
         mock_get_manifest: MagicMock,
-        mock_truncate_s3_partition: MagicMock,
         mock_update_job_with_s3_inventory_in_postgres: MagicMock,
     ):
         """
@@ -87,10 +87,8 @@ class TestGetCurrentArchiveList(
             datetime.datetime(2022, 2, 2, 0, 0, 0, tzinfo=datetime.timezone.utc),
             mock_get_user_connection.return_value,
         )
-        mock_truncate_s3_partition.assert_called_once_with(
-            mock_orca_archive_location, mock_get_admin_connection.return_value
-        )
         mock_update_job_with_s3_inventory_in_postgres.assert_called_once_with(
+            mock_orca_archive_location,
             mock_s3_access_key,
             mock_s3_secret_key,
             mock_report_bucket_name,
@@ -165,7 +163,6 @@ class TestGetCurrentArchiveList(
     @patch("get_current_archive_list.LOGGER")
     @patch("get_current_archive_list.update_job")
     @patch("get_current_archive_list.update_job_with_s3_inventory_in_postgres")
-    @patch("get_current_archive_list.truncate_s3_partition")
     @patch("get_current_archive_list.get_manifest")
     @patch("get_current_archive_list.create_job")
     @patch("orca_shared.database.shared_db.get_admin_connection")
@@ -176,7 +173,6 @@ class TestGetCurrentArchiveList(
         mock_get_admin_connection: MagicMock,
         mock_create_job: MagicMock,
         mock_get_manifest: MagicMock,
-        mock_truncate_s3_partition: MagicMock,
         mock_update_job_with_s3_inventory_in_postgres: MagicMock,
         mock_update_job: MagicMock,
         mock_logger: MagicMock,
@@ -209,7 +205,7 @@ class TestGetCurrentArchiveList(
         }
         mock_job_id = Mock()
         mock_create_job.return_value = mock_job_id
-        mock_truncate_s3_partition.side_effect = expected_exception
+        mock_update_job_with_s3_inventory_in_postgres.side_effect = expected_exception
 
         with self.assertRaises(Exception) as cm:
             get_current_archive_list.task(
@@ -234,10 +230,17 @@ class TestGetCurrentArchiveList(
             datetime.datetime(2022, 2, 2, 0, 0, 0, tzinfo=datetime.timezone.utc),
             mock_get_user_connection.return_value,
         )
-        mock_truncate_s3_partition.assert_called_once_with(
-            mock_orca_archive_location, mock_get_admin_connection.return_value
+        mock_update_job_with_s3_inventory_in_postgres.assert_called_once_with(
+            mock_orca_archive_location,
+            mock_s3_access_key,
+            mock_s3_secret_key,
+            mock_report_bucket_name,
+            mock_report_bucket_aws_region,
+            manifest_file_keys,
+            mock_manifest_file_schema,
+            mock_job_id,
+            mock_get_admin_connection.return_value,
         )
-        mock_update_job_with_s3_inventory_in_postgres.assert_not_called()
 
         mock_logger.error.assert_called_once_with(
             f"Encountered a fatal error: {expected_exception}"
@@ -378,8 +381,8 @@ class TestGetCurrentArchiveList(
             Exception, expected_exception, unittest.mock.ANY
         )
         mock_create_job_sql.assert_called_once_with()
-        mock_logger.error.assert_called_once_with(
-            f"Error while creating job: {expected_exception}"
+        mock_logger.exception.assert_called_once_with(
+            "Error while creating job: %s", expected_exception
         )
 
     @patch("get_current_archive_list.get_partition_name_from_bucket_name")
@@ -396,21 +399,14 @@ class TestGetCurrentArchiveList(
         mock_execute = Mock()
         mock_connection = Mock()
         mock_connection.execute = mock_execute
-        mock_exit = Mock(return_value=False)
-        mock_enter = Mock()
-        mock_enter.__enter__ = Mock(return_value=mock_connection)
-        mock_enter.__exit__ = mock_exit
-        mock_engine = Mock()
-        mock_engine.begin = Mock(return_value=mock_enter)
 
         get_current_archive_list.truncate_s3_partition(
-            mock_orca_archive_location, mock_engine
+            mock_orca_archive_location, mock_connection
         )
 
         mock_get_partition_name_from_bucket_name.assert_called_once_with(
             mock_orca_archive_location
         )
-        mock_enter.__enter__.assert_called_once_with()
         mock_truncate_s3_partition_sql.assert_called_once_with(
             mock_get_partition_name_from_bucket_name.return_value
         )
@@ -418,7 +414,6 @@ class TestGetCurrentArchiveList(
             mock_truncate_s3_partition_sql.return_value,
             [{}],
         )
-        mock_exit.assert_called_once_with(None, None, None)
 
     @patch("get_current_archive_list.LOGGER")
     @patch("get_current_archive_list.get_partition_name_from_bucket_name")
@@ -438,23 +433,16 @@ class TestGetCurrentArchiveList(
         mock_execute = Mock(side_effect=expected_exception)
         mock_connection = Mock()
         mock_connection.execute = mock_execute
-        mock_exit = Mock(return_value=False)
-        mock_enter = Mock()
-        mock_enter.__enter__ = Mock(return_value=mock_connection)
-        mock_enter.__exit__ = mock_exit
-        mock_engine = Mock()
-        mock_engine.begin = Mock(return_value=mock_enter)
 
         with self.assertRaises(Exception) as cm:
             get_current_archive_list.truncate_s3_partition(
-                mock_orca_archive_location, mock_engine
+                mock_orca_archive_location, mock_connection
             )
         self.assertEqual(expected_exception, cm.exception)
 
         mock_get_partition_name_from_bucket_name.assert_called_once_with(
             mock_orca_archive_location
         )
-        mock_enter.__enter__.assert_called_once_with()
         mock_truncate_s3_partition_sql.assert_called_once_with(
             mock_get_partition_name_from_bucket_name.return_value
         )
@@ -462,13 +450,13 @@ class TestGetCurrentArchiveList(
             mock_truncate_s3_partition_sql.return_value,
             [{}],
         )
-        mock_exit.assert_called_once_with(
-            Exception, expected_exception, unittest.mock.ANY
-        )
-        mock_logger.error.assert_called_once_with(
-            f"Error while truncating bucket '{mock_orca_archive_location}': {expected_exception}"
+        mock_logger.exception.assert_called_once_with(
+            "Error while truncating bucket '%s': %s",
+            mock_orca_archive_location,
+            expected_exception,
         )
 
+    @patch("get_current_archive_list.truncate_s3_partition")
     @patch("orca_shared.reconciliation.shared_reconciliation.update_job")
     @patch("get_current_archive_list.translate_s3_import_to_partitioned_data_sql")
     @patch("get_current_archive_list.trigger_csv_load_from_s3_sql")
@@ -483,11 +471,13 @@ class TestGetCurrentArchiveList(
         mock_trigger_csv_load_from_s3_sql: MagicMock,
         mock_translate_s3_import_to_partitioned_data_sql: MagicMock,
         mock_update_job: MagicMock,
+        mock_truncate_s3_partition: MagicMock,
     ):
         """
         Happy path for pulling s3 inventory csv into postgres.
         Should perform each operation in a single transaction.
         """
+        mock_orca_archive_location = Mock()
         mock_s3_access_key = Mock()
         mock_s3_secret_key = Mock()
         mock_report_bucket_name = Mock()
@@ -507,8 +497,12 @@ class TestGetCurrentArchiveList(
         mock_enter.__exit__ = mock_exit
         mock_engine = Mock()
         mock_engine.begin = Mock(return_value=mock_enter)
+        mock_call_order = Mock()
+        mock_call_order.attach_mock(mock_add_metadata_to_gzip, "add_metadata_to_gzip")
+        mock_call_order.attach_mock(mock_engine.begin, "begin")
 
         get_current_archive_list.update_job_with_s3_inventory_in_postgres(
+            mock_orca_archive_location,
             mock_s3_access_key,
             mock_s3_secret_key,
             mock_report_bucket_name,
@@ -523,19 +517,23 @@ class TestGetCurrentArchiveList(
             mock_manifest_file_schema
         )
         mock_enter.__enter__.assert_called_once_with()
+        mock_truncate_s3_partition.assert_called_once_with(
+            mock_orca_archive_location, mock_connection
+        )
         mock_add_metadata_to_gzip.assert_has_calls(
             [
                 call(mock_report_bucket_name, mock_csv_key_path)
                 for mock_csv_key_path in mock_csv_key_paths
-            ]
+            ],
+            any_order=True,
         )
         self.assertEqual(len(mock_csv_key_paths), mock_add_metadata_to_gzip.call_count)
-        mock_trigger_csv_load_from_s3_sql.assert_has_calls(
-            [call() for mock_csv_key_path in mock_csv_key_paths]
-        )
+        # S3 calls should not run inside the transaction.
         self.assertEqual(
-            len(mock_csv_key_paths), mock_trigger_csv_load_from_s3_sql.call_count
+            call.begin(),
+            mock_call_order.mock_calls[len(mock_csv_key_paths)],
         )
+        mock_trigger_csv_load_from_s3_sql.assert_called_once_with()
         mock_translate_s3_import_to_partitioned_data_sql.assert_called_once_with()
         mock_update_job.assert_called_once_with(
             mock_job_id,
@@ -560,9 +558,9 @@ class TestGetCurrentArchiveList(
                             "s3_access_key": mock_s3_access_key,
                             "s3_secret_key": mock_s3_secret_key,
                         }
+                        for mock_csv_key_path in mock_csv_key_paths
                     ],
                 )
-                for mock_csv_key_path in mock_csv_key_paths
             ]
         )
         mock_execute.assert_has_calls(
@@ -573,10 +571,11 @@ class TestGetCurrentArchiveList(
                 )
             ]
         )
-        self.assertEqual(len(mock_csv_key_paths) + 2, mock_execute.call_count)
+        self.assertEqual(3, mock_execute.call_count)
         mock_exit.assert_called_once_with(None, None, None)
 
     @patch("get_current_archive_list.LOGGER")
+    @patch("get_current_archive_list.truncate_s3_partition")
     @patch("orca_shared.reconciliation.shared_reconciliation.update_job")
     @patch("get_current_archive_list.get_partition_name_from_bucket_name")
     @patch("get_current_archive_list.translate_s3_import_to_partitioned_data_sql")
@@ -593,12 +592,14 @@ class TestGetCurrentArchiveList(
         mock_translate_s3_import_to_partitioned_data_sql: MagicMock,
         mock_get_partition_name_from_bucket_name: MagicMock,
         mock_update_job: MagicMock,
+        mock_truncate_s3_partition: MagicMock,
         mock_logger: MagicMock,
     ):
         """
         Exceptions from Postgres should bubble up.
         """
         expected_exception = Exception(uuid.uuid4().__str__())
+        mock_orca_archive_location = Mock()
         mock_s3_access_key = Mock()
         mock_s3_secret_key = Mock()
         mock_report_bucket_name = Mock()
@@ -621,6 +622,7 @@ class TestGetCurrentArchiveList(
 
         with self.assertRaises(Exception) as cm:
             get_current_archive_list.update_job_with_s3_inventory_in_postgres(
+                mock_orca_archive_location,
                 mock_s3_access_key,
                 mock_s3_secret_key,
                 mock_report_bucket_name,
@@ -642,11 +644,12 @@ class TestGetCurrentArchiveList(
         mock_exit.assert_called_once_with(
             Exception, expected_exception, unittest.mock.ANY
         )
-        mock_logger.error.assert_called_once_with(
-            f"Error while processing job '{mock_job_id}': {expected_exception}"
+        mock_logger.exception.assert_called_once_with(
+            "Error while processing job '%s': %s", mock_job_id, expected_exception
         )
 
     @patch("get_current_archive_list.LOGGER")
+    @patch("get_current_archive_list.truncate_s3_partition")
     @patch("orca_shared.reconciliation.shared_reconciliation.update_job")
     @patch("get_current_archive_list.get_partition_name_from_bucket_name")
     @patch("get_current_archive_list.translate_s3_import_to_partitioned_data_sql")
@@ -663,11 +666,13 @@ class TestGetCurrentArchiveList(
         mock_translate_s3_import_to_partitioned_data_sql: MagicMock,
         mock_get_partition_name_from_bucket_name: MagicMock,
         mock_update_job: MagicMock,
+        mock_truncate_s3_partition: MagicMock,
         mock_logger: MagicMock,
     ):
         """
         If AWS starts giving us non-csv.gz files, we should raise an error.
         """
+        mock_orca_archive_location = Mock()
         mock_s3_access_key = Mock()
         mock_s3_secret_key = Mock()
         mock_report_bucket_name = Mock()
@@ -688,6 +693,7 @@ class TestGetCurrentArchiveList(
 
         with self.assertRaises(Exception) as cm:
             get_current_archive_list.update_job_with_s3_inventory_in_postgres(
+                mock_orca_archive_location,
                 mock_s3_access_key,
                 mock_s3_secret_key,
                 mock_report_bucket_name,
@@ -704,60 +710,144 @@ class TestGetCurrentArchiveList(
         mock_generate_temporary_s3_column_list.assert_called_once_with(
             mock_manifest_file_schema
         )
-        mock_execute.assert_called_once_with(
-            mock_create_temporary_table_sql.return_value, [{}]
+        mock_add_metadata_to_gzip.assert_not_called()
+        mock_engine.begin.assert_not_called()
+        mock_execute.assert_not_called()
+        mock_logger.exception.assert_called_once_with(
+            "Error while processing job '%s': %s", mock_job_id, cm.exception
         )
-        mock_exit.assert_called_once_with(
-            Exception, unittest.mock.ANY, unittest.mock.ANY
+
+    @patch("get_current_archive_list.truncate_s3_partition")
+    @patch("orca_shared.reconciliation.shared_reconciliation.update_job")
+    @patch("get_current_archive_list.translate_s3_import_to_partitioned_data_sql")
+    @patch("get_current_archive_list.trigger_csv_load_from_s3_sql")
+    @patch("get_current_archive_list.ThreadPoolExecutor")
+    @patch("get_current_archive_list.add_metadata_to_gzip")
+    @patch("get_current_archive_list.create_temporary_table_sql")
+    @patch("get_current_archive_list.generate_temporary_s3_column_list")
+    def test_update_job_with_s3_inventory_in_postgres_single_csv_skips_executor(
+        self,
+        mock_generate_temporary_s3_column_list: MagicMock,
+        mock_create_temporary_table_sql: MagicMock,
+        mock_add_metadata_to_gzip: MagicMock,
+        mock_thread_pool_executor: MagicMock,
+        mock_trigger_csv_load_from_s3_sql: MagicMock,
+        mock_translate_s3_import_to_partitioned_data_sql: MagicMock,
+        mock_update_job: MagicMock,
+        mock_truncate_s3_partition: MagicMock,
+    ):
+        """
+        A single csv should have its metadata added without a thread pool.
+        """
+        mock_report_bucket_name = Mock()
+        mock_csv_key_path = uuid.uuid4().__str__() + ".csv.gz"
+        mock_engine = MagicMock()
+
+        get_current_archive_list.update_job_with_s3_inventory_in_postgres(
+            Mock(),
+            Mock(),
+            Mock(),
+            mock_report_bucket_name,
+            Mock(),
+            [mock_csv_key_path],
+            Mock(),
+            Mock(),
+            mock_engine,
         )
-        mock_logger.error.assert_called_once_with(
-            f"Error while processing job '{mock_job_id}': {cm.exception}"
+
+        mock_add_metadata_to_gzip.assert_called_once_with(
+            mock_report_bucket_name, mock_csv_key_path
         )
+        mock_thread_pool_executor.assert_not_called()
+        mock_engine.begin.assert_called_once_with()
+
+    @patch.dict(get_current_archive_list._CLIENTS, clear=True)
+    @patch("boto3.client")
+    def test_get_s3_client_reuses_client(self, mock_boto3_client: MagicMock):
+        """
+        The S3 client should only be created once and then reused.
+        """
+        first_client = get_current_archive_list.get_s3_client()
+        second_client = get_current_archive_list.get_s3_client()
+
+        mock_boto3_client.assert_called_once_with("s3")
+        self.assertEqual(mock_boto3_client.return_value, first_client)
+        self.assertEqual(first_client, second_client)
+
+    @patch.dict(get_current_archive_list._CLIENTS, clear=True)
+    @patch("boto3.client")
+    def test_get_s3_client_concurrent_first_calls_create_one_client(
+        self, mock_boto3_client: MagicMock
+    ):
+        """
+        Threads asking for the client at the same time should only create it once,
+        since the default boto3 session is not thread safe.
+        """
+
+        def slow_client(*args, **kwargs):
+            time.sleep(0.05)
+            return Mock()
+
+        mock_boto3_client.side_effect = slow_client
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            clients = list(
+                executor.map(
+                    lambda _: get_current_archive_list.get_s3_client(), range(4)
+                )
+            )
 
-    @patch("boto3.resource")
-    def test_add_metadata_to_gzip_happy_path(self, mock_boto3_resource: MagicMock):
+        mock_boto3_client.assert_called_once_with("s3")
+        self.assertEqual(1, len(set(map(id, clients))))
+
+    @patch("get_current_archive_list.get_s3_client")
+    def test_add_metadata_to_gzip_happy_path(self, mock_get_s3_client: MagicMock):
         """
         Happy path for adding missing metadata to AWS Inventory csv.gz files.
         """
-        mock_s3_object = mock_boto3_resource.return_value.Object.return_value
-        mock_s3_object.content_encoding = None
+        mock_s3_client = mock_get_s3_client.return_value
+        mock_metadata = Mock()
+        mock_s3_client.head_object.return_value = {"Metadata": mock_metadata}
         mock_report_bucket_name = Mock()
         mock_gzip_key_path = Mock()
         get_current_archive_list.add_metadata_to_gzip(
             mock_report_bucket_name, mock_gzip_key_path
         )
 
-        mock_boto3_resource.assert_called_once_with("s3")
-        mock_boto3_resource.return_value.Object.assert_called_once_with(
-            mock_report_bucket_name, mock_gzip_key_path
+        mock_s3_client.head_object.assert_called_once_with(
+            Bucket=mock_report_bucket_name, Key=mock_gzip_key_path
         )
-        mock_s3_object.copy_from.assert_called_once_with(
+        mock_s3_client.copy_object.assert_called_once_with(
+            Bucket=mock_report_bucket_name,
+            Key=mock_gzip_key_path,
             CopySource={"Bucket": mock_report_bucket_name, "Key": mock_gzip_key_path},
-            Metadata=mock_s3_object.metadata,
+            Metadata=mock_metadata,
             MetadataDirective="REPLACE",
             ContentEncoding="gzip",
         )
 
-    @patch("boto3.resource")
+    @patch("get_current_archive_list.get_s3_client")
     def test_add_metadata_to_gzip_already_present_does_not_copy(
-        self, mock_boto3_resource: MagicMock
+        self, mock_get_s3_client: MagicMock
     ):
         """
         If metadata is already present, do not add.
         """
-        mock_s3_object = mock_boto3_resource.return_value.Object.return_value
-        mock_s3_object.content_encoding = Mock()
+        mock_s3_client = mock_get_s3_client.return_value
+        mock_s3_client.head_object.return_value = {
+            "ContentEncoding": "gzip",
+            "Metadata": {},
+        }
         mock_report_bucket_name = Mock()
         mock_gzip_key_path = Mock()
         get_current_archive_list.add_metadata_to_gzip(
             mock_report_bucket_name, mock_gzip_key_path
         )
 
-        mock_boto3_resource.assert_called_once_with("s3")
-        mock_boto3_resource.return_value.Object.assert_called_once_with(
-            mock_report_bucket_name, mock_gzip_key_path
+        mock_s3_client.head_object.assert_called_once_with(
+            Bucket=mock_report_bucket_name, Key=mock_gzip_key_path
         )
-        mock_s3_object.copy_from.assert_not_called()
+        mock_s3_client.copy_object.assert_not_called()
 
     def test_generate_temporary_s3_column_list_happy_path(self):
         """
@@ -908,9 +998,10 @@ class TestGetCurrentArchiveList(
             MaxNumberOfMessages=1,
         )
 
+    @patch("get_current_archive_list.LOGGER")
     @patch("boto3.client")
     def test_get_message_from_queue_rejects_bad_json_format(
-        self, mock_client: MagicMock
+        self, mock_client: MagicMock, mock_logger: MagicMock
     ):
         """
         If the body is not in the correct format, should raise an error.
@@ -944,6 +1035,7 @@ class TestGetCurrentArchiveList(
             f"'{get_current_archive_list.RECORD_MANIFEST_KEY_KEY}'] properties",
             str(cm.exception),
         )
+        mock_logger.error.assert_called_once_with(cm.exception)
 
     # noinspection PyPep8Naming
     @patch("get_current_archive_list.get_message_from_queue")
@@ -1111,6 +1203,7 @@ class TestGetCurrentArchiveList(
             f"'{get_current_archive_list.OUTPUT_ORCA_ARCHIVE_LOCATION_KEY}'] properties",
             str(cm.exception),
         )
+        mock_LOGGER.error.assert_called_once_with(cm.exception)
 
     @patch.dict(
         os.environ,
@@ -19,6 +19,11 @@ from sqlalchemy import text
 from sqlalchemy.future import Engine
 
 LOGGER = Logger()
+
+# Status ids checked for every file, looked up once instead of per file.
+PENDING_STATUS_ID = OrcaStatus.PENDING.value
+FAILED_STATUS_ID = OrcaStatus.FAILED.value
+
 # Generating schema validators can take time, so do it once and reuse.
 try:
     with open("schemas/new_job_input.json", "r") as raw_schema:
@@ -121,9 +126,9 @@ def create_status_for_job_and_files(
     job_completion_time = None
     file_parameters = []
     for file in files:
-        if file[shared_recovery.STATUS_ID_KEY] == OrcaStatus.PENDING.value:
+        if file[shared_recovery.STATUS_ID_KEY] == PENDING_STATUS_ID:
             found_pending = True
-        elif file[shared_recovery.STATUS_ID_KEY] == OrcaStatus.FAILED.value:
+        elif file[shared_recovery.STATUS_ID_KEY] == FAILED_STATUS_ID:
             file_completion_time = datetime.datetime.fromisoformat(
                 file[shared_recovery.COMPLETION_TIME_KEY]
             )
@@ -7,6 +7,7 @@ then triggers the internal report step function.
 """
 import json
 import os
+import threading
 import time
 from typing import Any, Dict, TypeVar
 
@@ -16,6 +17,7 @@ import fastjsonschema
 # noinspection PyPackageRequirements
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.client import BaseClient
 
 import sqs_library
 from sqs_library import retry_error
@@ -29,6 +31,12 @@ OUTPUT_MANIFEST_KEY_KEY = "manifestKey"
 
 RT = TypeVar("RT")  # return type
 
+# boto3 clients by service name. Kept at module level so warm lambda invocations
+# reuse the client instead of rebuilding it.
+_CLIENTS: Dict[str, BaseClient] = {}
+# Creating clients from the default boto3 session is not thread safe.
+_CLIENTS_LOCK = threading.Lock()
+
 # Set AWS powertools logger
 LOGGER = Logger()
 # Generating schema validators can take time, so do it once and reuse.
@@ -91,6 +99,25 @@ def translate_record_body(s3_record: Dict[str, Any]) -> Dict[str, Any]:
     return new_body
 
 
+def get_stepfunctions_client() -> BaseClient:
+    """
+    Gets the Step Functions client, creating it on first use.
+    Creation is locked, since the default boto3 session is not thread safe.
+    Once created, the client may be shared across threads.
+        Returns:
+            A boto3 Step Functions client.
+    """
+    client = _CLIENTS.get("stepfunctions", None)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get("stepfunctions", None)
+            if client is None:
+                LOGGER.debug("Creating Step Functions client.")
+                client = boto3.client("stepfunctions")
+                _CLIENTS["stepfunctions"] = client
+    return client
+
+
 @retry_error()
 def trigger_step_function(
     step_function_arn: str,
@@ -100,7 +127,7 @@ def trigger_step_function(
     Args:
         step_function_arn: The arn of the step function to trigger.
     """
-    boto3.client("stepfunctions").start_execution(stateMachineArn=step_function_arn)
+    get_stepfunctions_client().start_execution(stateMachineArn=step_function_arn)
 
 
 @LOGGER.inject_lambda_context
@@ -9,6 +9,7 @@ import functools
 import hashlib
 import json
 import random
+import threading
 import time
 from typing import Any, Callable, Dict, TypeVar
 
@@ -16,6 +17,7 @@ from typing import Any, Callable, Dict, TypeVar
 import boto3
 import fastjsonschema
 from aws_lambda_powertools import Logger
+from botocore.client import BaseClient
 
 # Set AWS powertools logger
 LOGGER = Logger()
@@ -25,6 +27,12 @@ BACKOFF_FACTOR = 2  # Value of the factor used to backoff
 INITIAL_BACKOFF_IN_SECONDS = 1  # Number of seconds to sleep the first time through.
 RT = TypeVar("RT")  # return type
 
+# boto3 clients by service name. Kept at module level so warm lambda invocations
+# reuse the client instead of rebuilding it.
+_CLIENTS: Dict[str, BaseClient] = {}
+# Creating clients from the default boto3 session is not thread safe.
+_CLIENTS_LOCK = threading.Lock()
+
 # Generating schema validators can take time, so do it once and reuse.
 try:
     with open("schemas/output_body.json", "r") as raw_schema:
@@ -34,6 +42,25 @@ except Exception as ex:
     raise
 
 
+def get_sqs_client() -> BaseClient:
+    """
+    Gets the SQS client, creating it on first use.
+    Creation is locked, since the default boto3 session is not thread safe.
+    Once created, the client may be shared across threads.
+        Returns:
+            A boto3 SQS client.
+    """
+    client = _CLIENTS.get("sqs", None)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get("sqs", None)
+            if client is None:
+                LOGGER.debug("Creating SQS client.")
+                client = boto3.client("sqs")
+                _CLIENTS["sqs"] = client
+    return client
+
+
 # Retry decorator for function
 # todo: Lacks unit tests. Will likely eventually be part of shared lib ORCA-148.
 def retry_error(
@@ -113,16 +140,14 @@ def post_to_fifo_queue(
     """
     LOGGER.debug("Validating the SQS message body with the schema.")
     _OUTPUT_BODY_VALIDATE(sqs_body)
-    body = json.dumps(sqs_body)
-    LOGGER.debug(
-        f"Creating SQS resource for {queue_url}",
-    )
+    # Compact separators keep the message, and the bytes hashed for its ids, small.
+    body = json.dumps(sqs_body, separators=(",", ":"))
     deduplication_id = hashlib.sha256(body.encode("utf8")).hexdigest()
 
     md5_body = hashlib.md5(body.encode("utf8")).hexdigest()  # nosec
 
     LOGGER.debug(f"Sending the following data to queue: {body}")
-    response = boto3.client("sqs").send_message(
+    response = get_sqs_client().send_message(
         QueueUrl=queue_url,
         MessageDeduplicationId=deduplication_id,
         MessageGroupId="general_group",
@@ -31,6 +31,8 @@ class TestPostToQueueAndTriggerStepFunction(
         Perform initial setup for the tests.
         """
         self.mock_sqs.start()
+        sqs_library._CLIENTS.clear()
+        post_to_queue_and_trigger_step_function._CLIENTS.clear()
         self.test_sqs = boto3.resource("sqs", region_name="us-east-2")
         self.queue = self.test_sqs.create_queue(QueueName="test-queue")
         self.queue_url = self.queue.url
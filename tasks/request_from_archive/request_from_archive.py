@@ -2,10 +2,14 @@
 Name: request_from_archive.py
 Description:  Lambda function that makes a restore request from archive bucket for each input file.
 """
+import functools
 import json
 import os
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Union
 
@@ -18,6 +22,9 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 # noinspection PyPackageRequirements
 from botocore.client import BaseClient
 
+# noinspection PyPackageRequirements
+from botocore.config import Config
+
 # noinspection PyPackageRequirements
 from botocore.exceptions import ClientError
 from fastjsonschema import JsonSchemaException
@@ -29,6 +36,22 @@ DEFAULT_RESTORE_RETRY_SLEEP_SECS = 0
 
 VALID_RESTORE_TYPES = ["Bulk", "Expedited", "Standard"]
 
+# Maximum number of restore requests to have in flight at once for a granule.
+MAX_RESTORE_WORKERS = 16
+
+# Let botocore retry throttled and transient S3 errors with exponential backoff,
+# slowing down client side when S3 starts throttling.
+# Size the connection pool so concurrent restores do not wait on each other.
+S3_CLIENT_CONFIG = Config(
+    retries={"mode": "adaptive"}, max_pool_connections=MAX_RESTORE_WORKERS
+)
+
+# boto3 clients by service name. Kept at module level so warm lambda invocations
+# reuse the client instead of rebuilding it.
+_CLIENTS: Dict[str, BaseClient] = {}
+# Creating clients from the default boto3 session is not thread safe.
+_CLIENTS_LOCK = threading.Lock()
+
 OS_ENVIRON_RESTORE_EXPIRE_DAYS_KEY = "RESTORE_EXPIRE_DAYS"
 OS_ENVIRON_RESTORE_REQUEST_RETRIES_KEY = "RESTORE_REQUEST_RETRIES"
 OS_ENVIRON_RESTORE_RETRY_SLEEP_SECS_KEY = "RESTORE_RETRY_SLEEP_SECS"
@@ -69,6 +92,14 @@ FILE_FILENAME_KEY = "filename"
 FILE_LAST_UPDATE_KEY = "lastUpdate"
 FILE_MULTIPART_CHUNKSIZE_MB_KEY = "s3MultipartChunksizeMb"
 
+# Status ids set on every file, looked up once instead of per file.
+PENDING_STATUS_ID = shared_recovery.OrcaStatus.PENDING.value
+FAILED_STATUS_ID = shared_recovery.OrcaStatus.FAILED.value
+
+# Error codes returned by restore_object when the file or archive bucket is missing.
+# Retrying these will not help, so the file is failed immediately.
+NOT_FOUND_ERROR_CODES = frozenset({"NoSuchKey", "NoSuchBucket"})
+
 # Set AWS powertools logger
 LOGGER = Logger()
 
@@ -88,6 +119,25 @@ except Exception as schema_ex:
     raise
 
 
+def get_s3_client() -> BaseClient:
+    """
+    Gets the S3 client, creating it on first use.
+    Creation is locked, since the default boto3 session is not thread safe.
+    Once created, the client may be shared across threads.
+        Returns:
+            A boto3 S3 client.
+    """
+    client = _CLIENTS.get("s3", None)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get("s3", None)
+            if client is None:
+                LOGGER.debug("Creating S3 client.")
+                client = boto3.client("s3", config=S3_CLIENT_CONFIG)
+                _CLIENTS["s3"] = client
+    return client
+
+
 class RestoreRequestError(Exception):
     """
     Exception to be raised if the restore request fails submission for any of the files.
@@ -99,7 +149,7 @@ def task(
     event: Dict,
 ) -> Dict[str, Any]:
     """
-    Pulls information from os.environ, utilizing defaults if needed,
+    Gets settings from get_environment_settings and the event,
     then calls inner_task.
         Args:
             Note that because we are using CumulusMessageAdapter,
@@ -114,6 +164,69 @@ def task(
         Raises:
             RestoreRequestError: Thrown if there are errors with the input request.
     """
+    settings = get_environment_settings()
+
+    # Use the default archive bucket if none is specified for the collection or otherwise given.
+    event[EVENT_CONFIG_KEY][
+        CONFIG_DEFAULT_BUCKET_OVERRIDE_KEY
+    ] = get_default_archive_bucket_name(
+        event[EVENT_CONFIG_KEY]
+    )  # todo: pass this in as parameter instead of adjusting config dictionary.
+
+    # Set the JOB ID if one is not given
+    if event[EVENT_CONFIG_KEY][CONFIG_JOB_ID_KEY] is None:
+        event[EVENT_CONFIG_KEY][CONFIG_JOB_ID_KEY] = str(uuid.uuid4())
+        LOGGER.debug(
+            "No bulk job_id sent. Generated value %s for job_id.",
+            event[EVENT_CONFIG_KEY][CONFIG_JOB_ID_KEY],
+        )
+    # get the archive recovery type
+    recovery_type = get_archive_recovery_type(event[EVENT_CONFIG_KEY])
+
+    # Call the inner task to perform the work of restoring
+    return inner_task(  # todo: Split 'event' into relevant properties.
+        event,
+        settings.max_retries,
+        settings.retry_sleep_secs,
+        recovery_type,
+        settings.exp_days,
+        settings.status_update_queue_url,
+        settings.archive_recovery_queue_url,
+    )
+
+
+@dataclass(frozen=True)
+class EnvironmentSettings:
+    """
+    Data class that holds the settings read from environment variables.
+
+    Contains:
+        max_retries: (int) The maximum number of retries for network operations.
+        retry_sleep_secs: (float) The number of seconds to sleep between retries.
+        exp_days: (int) The number of days restored files are kept.
+        status_update_queue_url: (str) The URL of the SQS queue to post status to.
+        archive_recovery_queue_url: (str) The URL of the SQS queue to post
+            already recovered files to.
+    """
+
+    max_retries: int
+    retry_sleep_secs: float
+    exp_days: int
+    status_update_queue_url: str
+    archive_recovery_queue_url: str
+
+
+@functools.lru_cache(maxsize=None)
+def get_environment_settings() -> EnvironmentSettings:
+    """
+    Reads settings from os.environ, utilizing defaults if needed.
+    Environment variables do not change for the life of the lambda container,
+    so they are read once and reused by warm invocations.
+        Environment Vars:
+            See docs in handler for details.
+        Returns:
+            The parsed settings.
+    """
     # Get max retries for loop back off
     try:
         max_retries = int(os.environ[OS_ENVIRON_RESTORE_REQUEST_RETRIES_KEY])
@@ -140,13 +253,6 @@ def task(
         os.environ[OS_ENVIRON_ARCHIVE_RECOVERY_QUEUE_URL_KEY]
     )
 
-    # Use the default archive bucket if none is specified for the collection or otherwise given.
-    event[EVENT_CONFIG_KEY][
-        CONFIG_DEFAULT_BUCKET_OVERRIDE_KEY
-    ] = get_default_archive_bucket_name(
-        event[EVENT_CONFIG_KEY]
-    )  # todo: pass this in as parameter instead of adjusting config dictionary.
-
     # Get number of days to keep before it sinks back down into inactive storage
     try:
         exp_days = int(os.environ[OS_ENVIRON_RESTORE_EXPIRE_DAYS_KEY])
@@ -157,22 +263,9 @@ def task(
         )
         exp_days = DEFAULT_RESTORE_EXPIRE_DAYS
 
-    # Set the JOB ID if one is not given
-    if event[EVENT_CONFIG_KEY][CONFIG_JOB_ID_KEY] is None:
-        event[EVENT_CONFIG_KEY][CONFIG_JOB_ID_KEY] = uuid.uuid4().__str__()
-        LOGGER.debug(
-            f"No bulk job_id sent. Generated value"
-            f" {event[EVENT_CONFIG_KEY][CONFIG_JOB_ID_KEY]} for job_id."
-        )
-    # get the archive recovery type
-    recovery_type = get_archive_recovery_type(event[EVENT_CONFIG_KEY])
-
-    # Call the inner task to perform the work of restoring
-    return inner_task(  # todo: Split 'event' into relevant properties.
-        event,
+    return EnvironmentSettings(
         max_retries,
         retry_sleep_secs,
-        recovery_type,
         exp_days,
         status_update_queue_url,
         archive_recovery_queue_url,
@@ -195,16 +288,18 @@ def get_archive_recovery_type(config: Dict[str, Any]) -> str:
     recovery_type = config.get(CONFIG_DEFAULT_RECOVERY_TYPE_OVERRIDE_KEY, None)
     if recovery_type is not None:
         LOGGER.info(
-            f"Using restore type of {recovery_type} "
-            f"found in the configuration {CONFIG_DEFAULT_RECOVERY_TYPE_OVERRIDE_KEY} key."
+            "Using restore type of %s found in the configuration %s key.",
+            recovery_type,
+            CONFIG_DEFAULT_RECOVERY_TYPE_OVERRIDE_KEY,
         )
     else:
         # Look for default from TF
         recovery_type = os.getenv(OS_ENVIRON_DEFAULT_RECOVERY_TYPE_KEY, None)
         if recovery_type is not None:
             LOGGER.info(
-                f"Using restore type of {recovery_type} "
-                f"found in the environment {OS_ENVIRON_DEFAULT_RECOVERY_TYPE_KEY} key."
+                "Using restore type of %s found in the environment %s key.",
+                recovery_type,
+                OS_ENVIRON_DEFAULT_RECOVERY_TYPE_KEY,
             )
         else:
             raise KeyError("Recovery type not set.")
@@ -282,73 +377,53 @@ def inner_task(
         CONFIG_MULTIPART_CHUNKSIZE_MB_KEY, None
     )
     if collection_multipart_chunksize_mb_str is None:
-        LOGGER.info(f"{CONFIG_MULTIPART_CHUNKSIZE_MB_KEY} is not set for config.")
+        LOGGER.info("%s is not set for config.", CONFIG_MULTIPART_CHUNKSIZE_MB_KEY)
         collection_multipart_chunksize_mb = None
     else:
         collection_multipart_chunksize_mb = int(collection_multipart_chunksize_mb_str)
 
-    # Get the granule array from the event
+    # Get the granule array and job id from the event
     granules = event[EVENT_INPUT_KEY][INPUT_GRANULES_KEY]
+    job_id = event[EVENT_CONFIG_KEY][CONFIG_JOB_ID_KEY]
 
-    # Create the S3 client
-    s3 = boto3.client("s3")  # pylint: disable-msg=invalid-name
+    # Get the S3 client
+    s3 = get_s3_client()  # pylint: disable-msg=invalid-name
 
     # Setup additional information and formatting for the event granule files
     # Setup initial array for the granules processed
     for granule in granules:
-        # Initialize the granule copy, file array, and timestamp variables
-        files = []
+        # Initialize the timestamp and file array variables
         time_stamp = datetime.now(timezone.utc).isoformat()
         if len(granule[GRANULE_KEYS_KEY]) == 0:
             LOGGER.warning(
                 f"No files given for granule '{granule[GRANULE_GRANULE_ID_KEY]}'"
             )
-        # Loop through the granule files and find the ones to restore
-        for keys in granule[GRANULE_KEYS_KEY]:
-            # Get the file key (path/filename)
-            file_key = keys[FILE_KEY_KEY]
-            # get the destination bucket for the file
-            destination_bucket_name = keys[FILE_DEST_BUCKET_KEY]
-
-            # Set the initial pending state for the file.
-            a_file = {
+        # Set the initial pending state for the granule files.
+        # S3 keys always use '/', regardless of the OS.
+        files = [
+            {
                 FILE_PROCESSED_KEY: False,
-                FILE_FILENAME_KEY: os.path.basename(file_key),
-                FILE_KEY_PATH_KEY: file_key,
-                FILE_RESTORE_DESTINATION_KEY: destination_bucket_name,
+                FILE_FILENAME_KEY: keys[FILE_KEY_KEY].rpartition("/")[2],
+                FILE_KEY_PATH_KEY: keys[FILE_KEY_KEY],
+                FILE_RESTORE_DESTINATION_KEY: keys[FILE_DEST_BUCKET_KEY],
                 FILE_MULTIPART_CHUNKSIZE_MB_KEY: collection_multipart_chunksize_mb,
-                FILE_STATUS_ID_KEY: shared_recovery.OrcaStatus.PENDING.value,
+                FILE_STATUS_ID_KEY: PENDING_STATUS_ID,
                 FILE_REQUEST_TIME_KEY: time_stamp,
                 FILE_LAST_UPDATE_KEY: time_stamp,
             }
-            file_info = get_s3_object_information(s3, archive_bucket, file_key)
-            if file_info is not None:
-                if (
-                    file_info["StorageClass"] == "DEEP_ARCHIVE"
-                    and recovery_type == "Expedited"
-                ):
-                    message = (
-                        f"File '{file_key}' from bucket '{archive_bucket}' "
-                        f"is in storage class '{file_info['StorageClass']}' "
-                        f"which is incompatible with recovery type '{recovery_type}'"
-                    )
-                    LOGGER.error(message)
-                    a_file[FILE_PROCESSED_KEY] = True
-                    a_file[FILE_STATUS_ID_KEY] = shared_recovery.OrcaStatus.FAILED.value
-                    a_file[FILE_ERROR_MESSAGE_KEY] = message
-                    a_file[FILE_COMPLETION_TIME_KEY] = time_stamp
-                else:
-                    LOGGER.info(
-                        f"Added {file_key} to the list of files we'll attempt to recover."
-                    )
-            else:
-                message = f"'{file_key}' does not exist in '{archive_bucket}' bucket"
-                LOGGER.error(message)
-                a_file[FILE_PROCESSED_KEY] = True
-                a_file[FILE_STATUS_ID_KEY] = shared_recovery.OrcaStatus.FAILED.value
-                a_file[FILE_ERROR_MESSAGE_KEY] = message
-                a_file[FILE_COMPLETION_TIME_KEY] = time_stamp
-            files.append(a_file)
+            for keys in granule[GRANULE_KEYS_KEY]
+        ]
+        # Only Expedited requests need the storage class up front.
+        # Missing files are otherwise reported by restore_object in process_granule.
+        if recovery_type == "Expedited":
+            for a_file in files:
+                check_expedited_file(s3, archive_bucket, a_file, time_stamp)
+        LOGGER.info(
+            "Added %d file(s) from granule '%s' to the list of files we'll attempt "
+            "to recover.",
+            sum(not a_file[FILE_PROCESSED_KEY] for a_file in files),
+            granule[GRANULE_GRANULE_ID_KEY],
+        )
 
         # Add file information in the proper format
         granule[GRANULE_RECOVER_FILES_KEY] = files
@@ -356,7 +431,6 @@ def inner_task(
         # Send initial job and status information to the database queues
         # post to DB-queue. Retry using exponential delay if it fails
         LOGGER.debug("Sending initial job status information to DB QUEUE.")
-        job_id = event[EVENT_CONFIG_KEY][CONFIG_JOB_ID_KEY]
         collection_id = granule[GRANULE_COLLECTION_ID_KEY]
         granule_id = granule[GRANULE_GRANULE_ID_KEY]
 
@@ -403,7 +477,7 @@ def inner_task(
     # information.
     return {
         "granules": granules,
-        "asyncOperationId": event[EVENT_CONFIG_KEY][CONFIG_JOB_ID_KEY],
+        "asyncOperationId": job_id,
     }
 
 
@@ -449,32 +523,84 @@ def process_granule(
     attempt = 1
     collection_id = granule[GRANULE_COLLECTION_ID_KEY]
     granule_id = granule[GRANULE_GRANULE_ID_KEY]
+    failed_file_updates = []
+
+    # Only restore files we have not restored or have not successfully been restored
+    pending_files = [
+        a_file
+        for a_file in granule[GRANULE_RECOVER_FILES_KEY]
+        if not a_file[FILE_PROCESSED_KEY]
+    ]
+
+    # The request is the same for every file, so build it once.
+    restore_request = build_restore_request(restore_expire_days, recovery_type)
 
     # Try to restore objects in S3
-    while attempt <= max_retries + 1:
-        for a_file in granule[GRANULE_RECOVER_FILES_KEY]:
-            # Only restore files we have not restored or have not successfully been restored
-            if not a_file[FILE_PROCESSED_KEY]:
+    # Each restore is a separate S3 request, so run them concurrently.
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(MAX_RESTORE_WORKERS, len(pending_files)))
+    ) as executor:
+        while attempt <= max_retries + 1:
+            futures = []
+            for a_file in pending_files:
                 LOGGER.debug(
-                    f"Attempting to restore object at key "
-                    f"'{a_file[FILE_KEY_PATH_KEY]}'..."
+                    "Attempting to restore object at key '%s'...",
+                    a_file[FILE_KEY_PATH_KEY],
                 )
-                try:
-                    restore_object(
+                futures.append(
+                    executor.submit(
+                        restore_object,
                         s3,
                         a_file[FILE_KEY_PATH_KEY],
-                        restore_expire_days,
+                        restore_request,
                         archive_bucket_name,
                         attempt,
                         job_id,
-                        recovery_type,
                         archive_recovery_queue_url,
                     )
+                )
+            # Files failed in this attempt share one timestamp.
+            attempt_time = datetime.now(timezone.utc)
+            attempt_time_iso = attempt_time.isoformat()
+            # Files that failed this attempt and should be retried.
+            retry_files = []
+            for a_file, future in zip(pending_files, futures):
+                try:
+                    future.result()
 
                     # Successful restore
                     a_file[FILE_PROCESSED_KEY] = True
 
                 except ClientError as err:
+                    if (
+                        err.response.get("Error", {}).get("Code")
+                        in NOT_FOUND_ERROR_CODES
+                    ):
+                        # The file will never be found, so fail it without retrying.
+                        message = (
+                            f"'{a_file[FILE_KEY_PATH_KEY]}' does not exist in "
+                            f"'{archive_bucket_name}' bucket"
+                        )
+                        LOGGER.error(message)
+                        a_file[FILE_PROCESSED_KEY] = True
+                        a_file[FILE_STATUS_ID_KEY] = FAILED_STATUS_ID
+                        a_file[FILE_ERROR_MESSAGE_KEY] = message
+                        a_file[FILE_COMPLETION_TIME_KEY] = attempt_time_iso
+                        failed_file_updates.append(
+                            (
+                                shared_recovery.build_file_status_update(
+                                    job_id,
+                                    collection_id,
+                                    granule_id,
+                                    a_file[FILE_FILENAME_KEY],
+                                    shared_recovery.OrcaStatus.FAILED,
+                                    message,
+                                    attempt_time,
+                                ),
+                                shared_recovery.RequestMethod.UPDATE_FILE,
+                            )
+                        )
+                        continue
                     # Set the message for logging and populate file's error message info.
                     LOGGER.error(
                         f"Failed to restore '{a_file[FILE_KEY_PATH_KEY]}' "
@@ -482,64 +608,48 @@ def process_granule(
                         f"Encountered error '{err}'."
                     )
                     a_file[FILE_ERROR_MESSAGE_KEY] = str(err)
+                    retry_files.append(a_file)
+            pending_files = retry_files
 
-        attempt = attempt + 1
+            attempt = attempt + 1
 
-        # Only sleep if not on last attempt.
-        # todo: Use backoff code. ORCA-201
-        if attempt <= max_retries + 1:
-            # Check for early completion.
-            if all(
-                a_file[FILE_PROCESSED_KEY]
-                for a_file in granule[GRANULE_RECOVER_FILES_KEY]
-            ):
-                break
-            # No early completion sleep and try again
-            time.sleep(retry_sleep_secs)
+            # Only sleep if not on last attempt.
+            # todo: Use backoff code. ORCA-201
+            if attempt <= max_retries + 1:
+                # Check for early completion.
+                if len(pending_files) == 0:
+                    break
+                # No early completion sleep and try again
+                time.sleep(retry_sleep_secs)
 
     # update the status of failed files. Initialize the variables needed
     # for the loop.
     any_error = False
     failed_files = []
+    # Files failed after the last attempt share one timestamp.
+    completion_time = datetime.now(timezone.utc)
+    completion_time_iso = completion_time.isoformat()
     for a_file in granule[GRANULE_RECOVER_FILES_KEY]:
         if not a_file[FILE_PROCESSED_KEY]:
             # if any file failed, the whole granule will fail and the file
             # information should be updated
             any_error = True
-
-            # Update the file status information
-            a_file[FILE_STATUS_ID_KEY] = shared_recovery.OrcaStatus.FAILED.value
-            a_file[FILE_COMPLETION_TIME_KEY] = datetime.now(timezone.utc).isoformat()
-
-            # send message to DB SQS
-            # post to DB-queue. Retry using exponential delay if it fails
-            LOGGER.debug(
-                f"Sending status update information for {a_file[FILE_FILENAME_KEY]} to the QUEUE",
-            )
-            for attempt in range(max_retries + 1):
-                try:
-                    shared_recovery.update_status_for_file(
+            a_file[FILE_STATUS_ID_KEY] = FAILED_STATUS_ID
+            a_file[FILE_COMPLETION_TIME_KEY] = completion_time_iso
+            failed_file_updates.append(
+                (
+                    shared_recovery.build_file_status_update(
                         job_id,
                         collection_id,
                         granule_id,
                         a_file[FILE_FILENAME_KEY],
                         shared_recovery.OrcaStatus.FAILED,
                         a_file[FILE_ERROR_MESSAGE_KEY],
-                        status_update_queue_url,
-                    )
-                    break
-                except Exception as ex:
-                    LOGGER.error(
-                        f"Ran into error posting to SQS {attempt + 1} "
-                        f"time(s) with exception '{ex}'"
-                    )
-                    # todo: Use backoff code. ORCA-201
-                    time.sleep(retry_sleep_secs)
-                    continue
-            else:
-                message = f"Unable to send message to QUEUE '{status_update_queue_url}'"
-                LOGGER.critical(message)
-                raise Exception(message)
+                        completion_time,
+                    ),
+                    shared_recovery.RequestMethod.UPDATE_FILE,
+                )
+            )
 
         # Append updated file information to the file array
         failed_files.append(a_file)
@@ -547,6 +657,35 @@ def process_granule(
     # Update the granule file information
     granule[GRANULE_RECOVER_FILES_KEY] = failed_files
 
+    if len(failed_file_updates) > 0:
+        # send messages to DB SQS in batches
+        # post to DB-queue. Retry using exponential delay if it fails
+        # Failed entries are already resent within post_entries_to_fifo_queue.
+        # Entries resent here keep their de-duplication IDs,
+        # so the FIFO queue drops any that were already sent.
+        LOGGER.debug(
+            "Sending status update information for %d file(s) to the QUEUE",
+            len(failed_file_updates),
+        )
+        for attempt in range(max_retries + 1):
+            try:
+                shared_recovery.post_entries_to_fifo_queue(
+                    failed_file_updates, status_update_queue_url
+                )
+                break
+            except Exception as ex:
+                LOGGER.error(
+                    f"Ran into error posting to SQS {attempt + 1} "
+                    f"time(s) with exception '{ex}'"
+                )
+                # todo: Use backoff code. ORCA-201
+                time.sleep(retry_sleep_secs)
+                continue
+        else:
+            message = f"Unable to send message to QUEUE '{status_update_queue_url}'"
+            LOGGER.critical(message)
+            raise Exception(message)
+
     # If this is reached, that means there is no entry in the db for file's status.
     if any_error:
         LOGGER.error(
@@ -558,6 +697,38 @@ def process_granule(
         )
 
 
+def check_expedited_file(
+    s3_cli: BaseClient,
+    archive_bucket_name: str,
+    a_file: Dict[str, Any],
+    time_stamp: str,
+) -> None:
+    """Fails the file if it cannot be restored with an Expedited request.
+    Args:
+        s3_cli: An instance of boto3 s3 client
+        archive_bucket_name: The S3 archive bucket name.
+        a_file: The file entry built by inner_task. Modified if the file fails.
+        time_stamp: The completion time to set if the file fails.
+    """
+    file_key = a_file[FILE_KEY_PATH_KEY]
+    file_info = get_s3_object_information(s3_cli, archive_bucket_name, file_key)
+    if file_info is None:
+        message = f"'{file_key}' does not exist in '{archive_bucket_name}' bucket"
+    elif file_info["StorageClass"] == "DEEP_ARCHIVE":
+        message = (
+            f"File '{file_key}' from bucket '{archive_bucket_name}' "
+            f"is in storage class '{file_info['StorageClass']}' "
+            f"which is incompatible with recovery type 'Expedited'"
+        )
+    else:
+        return
+    LOGGER.error(message)
+    a_file[FILE_PROCESSED_KEY] = True
+    a_file[FILE_STATUS_ID_KEY] = FAILED_STATUS_ID
+    a_file[FILE_ERROR_MESSAGE_KEY] = message
+    a_file[FILE_COMPLETION_TIME_KEY] = time_stamp
+
+
 def get_s3_object_information(
     s3_cli: BaseClient, archive_bucket_name: str, file_key: str
 ) -> Optional[Dict[str, Any]]:
@@ -590,14 +761,26 @@ def get_s3_object_information(
         # 'S3.Client.exceptions.NoSuchKey instead of deconstructing ClientError
 
 
+def build_restore_request(days: int, recovery_type: str) -> Dict[str, Any]:
+    """Builds the RestoreRequest used for every file in a granule.
+    Args:
+        days: How many days the restored file will be accessible in the
+            S3 bucket before it expires.
+        recovery_type: Valid values are
+            'Standard'|'Bulk'|'Expedited'.
+    Returns:
+        The RestoreRequest for restore_object.
+    """
+    return {"Days": days, "GlacierJobParameters": {"Tier": recovery_type}}
+
+
 def restore_object(
     s3_cli: BaseClient,
     key: str,
-    days: int,
+    restore_request: Dict[str, Any],
     db_archive_bucket_key: str,
     attempt: int,
     job_id: str,
-    recovery_type: str,
     archive_recovery_queue_url: str,
 ) -> None:
     # noinspection SpellCheckingInspection
@@ -606,27 +789,25 @@ def restore_object(
     Args:
         s3_cli: An instance of boto3 s3 client.
         key: The key of the archived object being restored.
-        days: How many days the restored file will be accessible in the
-            S3 bucket before it expires.
+        restore_request: The RestoreRequest to submit. See build_restore_request.
         db_archive_bucket_key: The S3 bucket name.
         attempt: The attempt number for logging purposes.
         job_id: The unique id of the job. Used for logging.
-        recovery_type: Valid values are
-            'Standard'|'Bulk'|'Expedited'.
         archive_recovery_queue_url: The URL of the SQS queue that request_from_archive posts to
             in case of files already recovered from archive.
     Raises:
         None
     """
-    request = {"Days": days, "GlacierJobParameters": {"Tier": recovery_type}}
     # Submit the request
     restore_result = s3_cli.restore_object(
-        Bucket=db_archive_bucket_key, Key=key, RestoreRequest=request
+        Bucket=db_archive_bucket_key, Key=key, RestoreRequest=restore_request
     )
     if restore_result["ResponseMetadata"]["HTTPStatusCode"] == 200:
         LOGGER.info(
-            f"File '{key}' in bucket '{db_archive_bucket_key}' has already been recovered. "
-            "Sending to archive recovery SQS."
+            "File '%s' in bucket '%s' has already been recovered. "
+            "Sending to archive recovery SQS.",
+            key,
+            db_archive_bucket_key,
         )
         # Create message format for sending to archive recovery SQS
         message = {
@@ -644,8 +825,11 @@ def restore_object(
         )
 
     LOGGER.info(
-        f"Restore {key} from {db_archive_bucket_key} "
-        f"attempt {attempt} successful. Job ID: {job_id}"
+        "Restore %s from %s attempt %d successful. Job ID: %s",
+        key,
+        db_archive_bucket_key,
+        attempt,
+        job_id,
     )
 
 
@@ -688,9 +872,11 @@ def set_optional_event_property(
                 source_path_cursor = source_path_cursor.get(source_path_segment, None)
                 if source_path_cursor is None:
                     LOGGER.info(
-                        f"When retrieving '{'.'.join(temp_target_path_segments)}', "
-                        f"no value found in '{source_path}' at key {source_path_segment}. "
-                        f"Defaulting to null."
+                        "When retrieving '%s', no value found in '%s' at key %s. "
+                        "Defaulting to null.",
+                        ".".join(temp_target_path_segments),
+                        source_path,
+                        source_path_segment,
                     )
                     break
             event_cursor[temp_target_path_segments[-1]] = source_path_cursor
@@ -6,6 +6,7 @@ Description:  Unit tests for request_from_archive.py.
 import json
 import os
 import random
+import threading
 import unittest
 import uuid
 from random import randint, uniform
@@ -19,7 +20,7 @@ import fastjsonschema as fastjsonschema
 # noinspection PyPackageRequirements
 from botocore.exceptions import ClientError
 from orca_shared.recovery import shared_recovery
-from orca_shared.recovery.shared_recovery import OrcaStatus
+from orca_shared.recovery.shared_recovery import OrcaStatus, RequestMethod
 
 import request_from_archive
 
@@ -36,6 +37,8 @@ class TestRequestFromArchive(unittest.TestCase):
     def setUp(self):
         os.environ.pop("CUMULUS_MESSAGE_ADAPTER_DISABLED", None)
         self.maxDiff = None
+        request_from_archive._CLIENTS.clear()
+        request_from_archive.get_environment_settings.cache_clear()
 
     def tearDown(self):
         os.environ.pop("PREFIX", None)
@@ -54,6 +57,62 @@ class TestRequestFromArchive(unittest.TestCase):
         )
         os.environ.pop(request_from_archive.OS_ENVIRON_DEFAULT_RECOVERY_TYPE_KEY, None)
 
+    @patch("boto3.client")
+    def test_get_s3_client_reuses_client(self, mock_boto3_client: MagicMock):
+        """
+        The S3 client should only be created once and then reused.
+        """
+        first_client = request_from_archive.get_s3_client()
+        second_client = request_from_archive.get_s3_client()
+
+        mock_boto3_client.assert_called_once_with(
+            "s3", config=request_from_archive.S3_CLIENT_CONFIG
+        )
+        self.assertEqual(mock_boto3_client.return_value, first_client)
+        self.assertEqual(first_client, second_client)
+
+    def test_get_environment_settings_reads_environment_once(self):
+        """
+        Settings should be read from the environment once and then reused.
+        """
+        max_retries = randint(0, 99)  # nosec
+        retry_sleep_secs = uniform(0, 99)  # nosec
+        exp_days = randint(0, 99)  # nosec
+        db_queue_url = "http://" + uuid.uuid4().__str__() + ".blah"
+        archive_recovery_queue_url = "http://" + uuid.uuid4().__str__() + ".blah"
+        os.environ[request_from_archive.OS_ENVIRON_RESTORE_REQUEST_RETRIES_KEY] = str(
+            max_retries
+        )
+        os.environ[request_from_archive.OS_ENVIRON_RESTORE_RETRY_SLEEP_SECS_KEY] = str(
+            retry_sleep_secs
+        )
+        os.environ[request_from_archive.OS_ENVIRON_RESTORE_EXPIRE_DAYS_KEY] = str(
+            exp_days
+        )
+        os.environ[
+            request_from_archive.OS_ENVIRON_STATUS_UPDATE_QUEUE_URL_KEY
+        ] = db_queue_url
+        os.environ[
+            request_from_archive.OS_ENVIRON_ARCHIVE_RECOVERY_QUEUE_URL_KEY
+        ] = archive_recovery_queue_url
+
+        settings = request_from_archive.get_environment_settings()
+        os.environ[request_from_archive.OS_ENVIRON_RESTORE_REQUEST_RETRIES_KEY] = str(
+            max_retries + 1
+        )
+
+        self.assertEqual(
+            request_from_archive.EnvironmentSettings(
+                max_retries,
+                retry_sleep_secs,
+                exp_days,
+                db_queue_url,
+                archive_recovery_queue_url,
+            ),
+            settings,
+        )
+        self.assertIs(settings, request_from_archive.get_environment_settings())
+
     @patch("request_from_archive.get_default_archive_bucket_name")
     @patch("request_from_archive.inner_task")
     @patch("request_from_archive.get_archive_recovery_type")
@@ -960,6 +1019,7 @@ class TestRequestFromArchive(unittest.TestCase):
     ):
         """
         A return of None from get_s3_object_information should ignore the file and continue.
+        The existence check is only made for Expedited requests.
         """
         archive_bucket_name = uuid.uuid4().__str__()
         collection_multipart_chunksize_mb = random.randint(1, 10000)  # nosec
@@ -1055,7 +1115,7 @@ class TestRequestFromArchive(unittest.TestCase):
         }
         max_retries = randint(0, 99)  # nosec
         retry_sleep_secs = randint(0, 99)  # nosec
-        recovery_type = uuid.uuid4().__str__()
+        recovery_type = "Expedited"
         restore_expire_days = randint(0, 99)  # nosec
         mock_s3_cli = mock_boto3_client("s3")
 
@@ -1064,7 +1124,7 @@ class TestRequestFromArchive(unittest.TestCase):
             input_s3_cli, input_archive_bucket_name, input_file_key
         ):
             if input_file_key in [file_key_0, file_key_1]:
-                return {"StorageClass": "DEEP_ARCHIVE"}
+                return {"StorageClass": "GLACIER"}
             else:
                 return None
 
@@ -1399,28 +1459,78 @@ class TestRequestFromArchive(unittest.TestCase):
                 call(
                     mock_s3,
                     file_name_0,
-                    restore_expire_days,
+                    {
+                        "Days": restore_expire_days,
+                        "GlacierJobParameters": {"Tier": recovery_type},
+                    },
                     archive_bucket_name,
                     1,
                     job_id,
-                    recovery_type,
                     archive_recovery_queue_url,
                 ),
                 call(
                     mock_s3,
                     file_name_1,
-                    restore_expire_days,
+                    {
+                        "Days": restore_expire_days,
+                        "GlacierJobParameters": {"Tier": recovery_type},
+                    },
                     archive_bucket_name,
                     1,
                     job_id,
-                    recovery_type,
                     archive_recovery_queue_url,
                 ),
-            ]
+            ],
+            any_order=True,
         )
         self.assertEqual(2, mock_restore_object.call_count)
         mock_sleep.assert_not_called()
 
+    @patch("time.sleep")
+    @patch("request_from_archive.restore_object")
+    def test_process_granule_restores_files_concurrently(
+        self, mock_restore_object: MagicMock, mock_sleep: MagicMock
+    ):
+        """
+        Restores for a granule's files should be in flight at the same time.
+        """
+        file_count = 3
+        barrier = threading.Barrier(file_count, timeout=5)
+        # Each restore waits for the others, so this only completes if all are concurrent.
+        mock_restore_object.side_effect = lambda *args: barrier.wait()
+        granule = {
+            request_from_archive.GRANULE_COLLECTION_ID_KEY: uuid.uuid4().__str__(),
+            request_from_archive.GRANULE_GRANULE_ID_KEY: uuid.uuid4().__str__(),
+            request_from_archive.GRANULE_RECOVER_FILES_KEY: [
+                {
+                    request_from_archive.FILE_PROCESSED_KEY: False,
+                    request_from_archive.FILE_FILENAME_KEY: file_name,
+                    request_from_archive.FILE_KEY_PATH_KEY: file_name,
+                    request_from_archive.FILE_RESTORE_DESTINATION_KEY: uuid.uuid4().__str__(),
+                    request_from_archive.FILE_STATUS_ID_KEY: 1,
+                }
+                for file_name in [uuid.uuid4().__str__() for _ in range(file_count)]
+            ],
+        }
+
+        request_from_archive.process_granule(
+            Mock(),
+            granule,
+            uuid.uuid4().__str__(),
+            randint(0, 99),  # nosec
+            0,
+            randint(0, 99),  # nosec
+            uuid.uuid4().__str__(),
+            uuid.uuid4().__str__(),
+            "http://" + uuid.uuid4().__str__() + ".blah",
+            "http://" + uuid.uuid4().__str__() + ".blah",
+        )
+
+        for a_file in granule[request_from_archive.GRANULE_RECOVER_FILES_KEY]:
+            self.assertTrue(a_file[request_from_archive.FILE_PROCESSED_KEY])
+        self.assertEqual(file_count, mock_restore_object.call_count)
+        mock_sleep.assert_not_called()
+
     @patch("time.sleep")
     @patch("request_from_archive.restore_object")
     def test_process_granule_one_client_or_key_error_retries(
@@ -1485,21 +1595,25 @@ class TestRequestFromArchive(unittest.TestCase):
                 call(
                     mock_s3,
                     file_name_0,
-                    restore_expire_days,
+                    {
+                        "Days": restore_expire_days,
+                        "GlacierJobParameters": {"Tier": recovery_type},
+                    },
                     archive_bucket_name,
                     1,
                     job_id,
-                    recovery_type,
                     archive_recovery_queue_url,
                 ),
                 call(
                     mock_s3,
                     file_name_0,
-                    restore_expire_days,
+                    {
+                        "Days": restore_expire_days,
+                        "GlacierJobParameters": {"Tier": recovery_type},
+                    },
                     archive_bucket_name,
                     2,
                     job_id,
-                    recovery_type,
                     archive_recovery_queue_url,
                 ),
             ]
@@ -1508,7 +1622,8 @@ class TestRequestFromArchive(unittest.TestCase):
         mock_sleep.assert_has_calls([call(retry_sleep_secs)])
         self.assertEqual(1, mock_sleep.call_count)
 
-    @patch("orca_shared.recovery.shared_recovery.update_status_for_file")
+    @patch("orca_shared.recovery.shared_recovery.post_entries_to_fifo_queue")
+    @patch("orca_shared.recovery.shared_recovery.build_file_status_update")
     @patch("time.sleep")
     @patch("request_from_archive.restore_object")
     @patch("request_from_archive.LOGGER.error")
@@ -1517,7 +1632,8 @@ class TestRequestFromArchive(unittest.TestCase):
         mock_logger_error: MagicMock,
         mock_restore_object: MagicMock,
         mock_sleep: MagicMock,
-        mock_update_status_for_file: MagicMock,
+        mock_build_file_status_update: MagicMock,
+        mock_post_entries_to_fifo_queue: MagicMock,
     ):
         mock_s3 = Mock()
         max_retries = randint(3, 20)  # nosec
@@ -1590,44 +1706,59 @@ class TestRequestFromArchive(unittest.TestCase):
                 call(
                     mock_s3,
                     file_name_0,
-                    restore_expire_days,
+                    {
+                        "Days": restore_expire_days,
+                        "GlacierJobParameters": {"Tier": recovery_type},
+                    },
                     archive_bucket_name,
                     1,
                     job_id,
-                    recovery_type,
                     archive_recovery_queue_url,
                 ),
                 call(
                     mock_s3,
                     file_name_0,
-                    restore_expire_days,
+                    {
+                        "Days": restore_expire_days,
+                        "GlacierJobParameters": {"Tier": recovery_type},
+                    },
                     archive_bucket_name,
                     2,
                     job_id,
-                    recovery_type,
                     archive_recovery_queue_url,
                 ),
                 call(
                     mock_s3,
                     file_name_0,
-                    restore_expire_days,
+                    {
+                        "Days": restore_expire_days,
+                        "GlacierJobParameters": {"Tier": recovery_type},
+                    },
                     archive_bucket_name,
                     3,
                     job_id,
-                    recovery_type,
                     archive_recovery_queue_url,
                 ),
             ]
         )
         self.assertEqual(max_retries + 1, mock_restore_object.call_count)
         mock_sleep.assert_has_calls([call(retry_sleep_secs)] * max_retries)
-        mock_update_status_for_file.assert_called_once_with(
+        mock_build_file_status_update.assert_called_once_with(
             job_id,
             collection_id,
             granule_id,
             file_name_0,
             OrcaStatus.FAILED,
             str(expected_error),
+            mock.ANY,
+        )
+        mock_post_entries_to_fifo_queue.assert_called_once_with(
+            [
+                (
+                    mock_build_file_status_update.return_value,
+                    RequestMethod.UPDATE_FILE,
+                )
+            ],
             db_queue_url,
         )
         mock_logger_error.assert_has_calls(
@@ -1643,7 +1774,117 @@ class TestRequestFromArchive(unittest.TestCase):
             ]
         )
 
-    @patch("orca_shared.recovery.shared_recovery.update_status_for_file")
+    @patch("orca_shared.recovery.shared_recovery.post_entries_to_fifo_queue")
+    @patch("orca_shared.recovery.shared_recovery.build_file_status_update")
+    @patch("time.sleep")
+    @patch("request_from_archive.restore_object")
+    def test_process_granule_missing_file_fails_without_retry(
+        self,
+        mock_restore_object: MagicMock,
+        mock_sleep: MagicMock,
+        mock_build_file_status_update: MagicMock,
+        mock_post_entries_to_fifo_queue: MagicMock,
+    ):
+        """
+        A NoSuchKey error from restore_object should fail the file without retrying
+        or failing the granule.
+        """
+        mock_s3 = Mock()
+        max_retries = randint(3, 20)  # nosec
+        archive_bucket_name = uuid.uuid4().__str__()
+        retry_sleep_secs = randint(0, 99)  # nosec
+        recovery_type = uuid.uuid4().__str__()
+        restore_expire_days = randint(0, 99)  # nosec
+        collection_id = uuid.uuid4().__str__()
+        granule_id = uuid.uuid4().__str__()
+        file_name_0 = uuid.uuid4().__str__()
+        dest_bucket_0 = uuid.uuid4().__str__()
+        job_id = uuid.uuid4().__str__()
+        db_queue_url = "http://" + uuid.uuid4().__str__() + ".blah"
+        archive_recovery_queue_url = "http://" + uuid.uuid4().__str__() + ".blah"
+
+        granule = {
+            request_from_archive.GRANULE_COLLECTION_ID_KEY: collection_id,
+            request_from_archive.GRANULE_GRANULE_ID_KEY: granule_id,
+            request_from_archive.GRANULE_RECOVER_FILES_KEY: [
+                {
+                    request_from_archive.FILE_FILENAME_KEY: file_name_0,
+                    request_from_archive.FILE_KEY_PATH_KEY: file_name_0,
+                    request_from_archive.FILE_RESTORE_DESTINATION_KEY: dest_bucket_0,
+                    request_from_archive.FILE_PROCESSED_KEY: False,
+                    request_from_archive.FILE_STATUS_ID_KEY: 1,
+                },
+            ],
+        }
+
+        mock_restore_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey", "Message": "Not Found"}}, "RestoreObject"
+        )
+
+        request_from_archive.process_granule(
+            mock_s3,
+            granule,
+            archive_bucket_name,
+            restore_expire_days,
+            max_retries,
+            retry_sleep_secs,
+            recovery_type,
+            job_id,
+            db_queue_url,
+            archive_recovery_queue_url,
+        )
+
+        expected_message = (
+            f"'{file_name_0}' does not exist in '{archive_bucket_name}' bucket"
+        )
+        result_file = granule[request_from_archive.GRANULE_RECOVER_FILES_KEY][0]
+        self.assertTrue(result_file[request_from_archive.FILE_PROCESSED_KEY])
+        self.assertEqual(
+            OrcaStatus.FAILED.value,
+            result_file[request_from_archive.FILE_STATUS_ID_KEY],
+        )
+        self.assertEqual(
+            expected_message, result_file[request_from_archive.FILE_ERROR_MESSAGE_KEY]
+        )
+        mock_restore_object.assert_called_once_with(
+            mock_s3,
+            file_name_0,
+            {
+                "Days": restore_expire_days,
+                "GlacierJobParameters": {"Tier": recovery_type},
+            },
+            archive_bucket_name,
+            1,
+            job_id,
+            archive_recovery_queue_url,
+        )
+        mock_sleep.assert_not_called()
+        mock_build_file_status_update.assert_called_once_with(
+            job_id,
+            collection_id,
+            granule_id,
+            file_name_0,
+            OrcaStatus.FAILED,
+            expected_message,
+            mock.ANY,
+        )
+        # The file and its status update should share a timestamp.
+        self.assertEqual(
+            result_file[request_from_archive.FILE_COMPLETION_TIME_KEY],
+            mock_build_file_status_update.call_args[0][6].isoformat(),
+        )
+        mock_post_entries_to_fifo_queue.assert_called_once_with(
+            [
+                (
+                    mock_build_file_status_update.return_value,
+                    RequestMethod.UPDATE_FILE,
+                )
+            ],
+            db_queue_url,
+        )
+
+    @patch("orca_shared.recovery.shared_recovery.post_entries_to_fifo_queue")
+    @patch("orca_shared.recovery.shared_recovery.build_file_status_update")
     @patch("time.sleep")
     @patch("request_from_archive.restore_object")
     @patch("request_from_archive.LOGGER.error")
@@ -1652,7 +1893,8 @@ class TestRequestFromArchive(unittest.TestCase):
         mock_logger_error: MagicMock,
         mock_restore_object: MagicMock,
         mock_sleep: MagicMock,
-        mock_update_status_for_file: MagicMock,
+        mock_build_file_status_update: MagicMock,
+        mock_post_entries_to_fifo_queue: MagicMock,
     ):
         """
         If a file expended all attempts for recovery, and posting to
@@ -1696,7 +1938,7 @@ class TestRequestFromArchive(unittest.TestCase):
         mock_restore_object.side_effect = expected_error
 
         expected_status_error = Exception(uuid.uuid4().__str__())
-        mock_update_status_for_file.side_effect = expected_status_error
+        mock_post_entries_to_fifo_queue.side_effect = expected_status_error
 
         try:
             request_from_archive.process_granule(
@@ -1729,51 +1971,66 @@ class TestRequestFromArchive(unittest.TestCase):
                 call(
                     mock_s3,
                     file_name_0,
-                    restore_expire_days,
+                    {
+                        "Days": restore_expire_days,
+                        "GlacierJobParameters": {"Tier": recovery_type},
+                    },
                     archive_bucket_name,
                     1,
                     job_id,
-                    recovery_type,
                     archive_recovery_queue_url,
                 ),
                 call(
                     mock_s3,
                     file_name_0,
-                    restore_expire_days,
+                    {
+                        "Days": restore_expire_days,
+                        "GlacierJobParameters": {"Tier": recovery_type},
+                    },
                     archive_bucket_name,
                     2,
                     job_id,
-                    recovery_type,
                     archive_recovery_queue_url,
                 ),
                 call(
                     mock_s3,
                     file_name_0,
-                    restore_expire_days,
+                    {
+                        "Days": restore_expire_days,
+                        "GlacierJobParameters": {"Tier": recovery_type},
+                    },
                     archive_bucket_name,
                     3,
                     job_id,
-                    recovery_type,
                     archive_recovery_queue_url,
                 ),
             ]
         )
-        mock_update_status_for_file.assert_has_calls(
+        mock_build_file_status_update.assert_called_once_with(
+            job_id,
+            collection_id,
+            granule_id,
+            file_name_0,
+            OrcaStatus.FAILED,
+            str(expected_error),
+            mock.ANY,
+        )
+        mock_post_entries_to_fifo_queue.assert_has_calls(
             [
                 call(
-                    job_id,
-                    collection_id,
-                    granule_id,
-                    file_name_0,
-                    OrcaStatus.FAILED,
-                    str(expected_error),
+                    [
+                        (
+                            mock_build_file_status_update.return_value,
+                            RequestMethod.UPDATE_FILE,
+                        )
+                    ],
                     db_queue_url,
                 )
             ]
             * (max_retries + 1)
         )
         self.assertEqual(max_retries + 1, mock_restore_object.call_count)
-        self.assertEqual(max_retries + 1, mock_update_status_for_file.call_count)
+        self.assertEqual(max_retries + 1, mock_post_entries_to_fifo_queue.call_count)
         mock_sleep.assert_has_calls([call(retry_sleep_secs)] * max_retries * 2)
         # The following does not check all error messages. Do not implement a call count check.
         mock_logger_error.assert_has_calls(
@@ -1790,6 +2047,33 @@ class TestRequestFromArchive(unittest.TestCase):
             any_order=True,
         )
 
+    @patch("request_from_archive.get_s3_object_information")
+    def test_check_expedited_file_compatible_file_unchanged(
+        self, mock_get_s3_object_information: MagicMock
+    ):
+        """
+        Files outside DEEP_ARCHIVE should be left pending.
+        """
+        mock_s3_cli = Mock()
+        archive_bucket_name = uuid.uuid4().__str__()
+        file_key = uuid.uuid4().__str__()
+        mock_get_s3_object_information.return_value = {"StorageClass": "GLACIER"}
+        a_file = {
+            request_from_archive.FILE_PROCESSED_KEY: False,
+            request_from_archive.FILE_KEY_PATH_KEY: file_key,
+            request_from_archive.FILE_STATUS_ID_KEY: OrcaStatus.PENDING.value,
+        }
+        expected_file = a_file.copy()
+
+        request_from_archive.check_expedited_file(
+            mock_s3_cli, archive_bucket_name, a_file, uuid.uuid4().__str__()
+        )
+
+        mock_get_s3_object_information.assert_called_once_with(
+            mock_s3_cli, archive_bucket_name, file_key
+        )
+        self.assertEqual(expected_file, a_file)
+
     def test_get_s3_object_information_happy_path(self):
         mock_s3_cli = Mock()
         mock_s3_cli.head_object.side_effect = None
@@ -1843,24 +2127,39 @@ class TestRequestFromArchive(unittest.TestCase):
             "ResponseMetadata": {"HTTPStatusCode": 202}
         }
 
+        restore_request = {
+            "Days": restore_expire_days,
+            "GlacierJobParameters": {"Tier": recovery_type},
+        }
+
         request_from_archive.restore_object(
             mock_s3_cli,
             key,
-            restore_expire_days,
+            restore_request,
             archive_bucket_name,
             randint(0, 99),  # nosec
             uuid.uuid4().__str__(),
-            recovery_type,
             archive_recovery_queue_url,
         )
 
         mock_s3_cli.restore_object.assert_called_once_with(
             Bucket=archive_bucket_name,
             Key=key,
-            RestoreRequest={
+            RestoreRequest=restore_request,
+        )
+
+    def test_build_restore_request(self):
+        restore_expire_days = randint(0, 99)  # nosec
+        recovery_type = uuid.uuid4().__str__()
+
+        self.assertEqual(
+            {
                 "Days": restore_expire_days,
                 "GlacierJobParameters": {"Tier": recovery_type},
             },
+            request_from_archive.build_restore_request(
+                restore_expire_days, recovery_type
+            ),
         )
 
     @patch("request_from_archive.shared_recovery.post_entry_to_standard_queue")
@@ -1888,11 +2187,13 @@ class TestRequestFromArchive(unittest.TestCase):
         request_from_archive.restore_object(
             mock_s3_cli,
             key,
-            restore_expire_days,
+            {
+                "Days": restore_expire_days,
+                "GlacierJobParameters": {"Tier": recovery_type},
+            },
             archive_bucket_name,
             2,
             uuid.uuid4().__str__(),
-            recovery_type,
             archive_recovery_queue_url,
         )
         message = {
@@ -2130,19 +2431,11 @@ class TestRequestFromArchive(unittest.TestCase):
 
         result = request_from_archive.handler(input_event, context)
 
-        mock_boto3_client.assert_has_calls([call("s3")])
-        mock_s3_cli.head_object.assert_any_call(
-            Bucket="my-dr-fake-archive-bucket", Key=file0
-        )
-        mock_s3_cli.head_object.assert_any_call(
-            Bucket="my-dr-fake-archive-bucket", Key=file1
-        )
-        mock_s3_cli.head_object.assert_any_call(
-            Bucket="my-dr-fake-archive-bucket", Key=file2
-        )
-        mock_s3_cli.head_object.assert_any_call(
-            Bucket="my-dr-fake-archive-bucket", Key=file3
+        mock_boto3_client.assert_has_calls(
+            [call("s3", config=request_from_archive.S3_CLIENT_CONFIG)]
         )
+        # Only Expedited requests check the storage class up front.
+        mock_s3_cli.head_object.assert_not_called()
         restore_req_exp = {"Days": 5, "GlacierJobParameters": {"Tier": "Standard"}}
 
         mock_s3_cli.restore_object.assert_any_call(
@@ -2160,7 +2453,7 @@ class TestRequestFromArchive(unittest.TestCase):
             Key=file2,
             RestoreRequest=restore_req_exp,
         )
-        mock_s3_cli.restore_object.assert_called_with(
+        mock_s3_cli.restore_object.assert_any_call(
             Bucket="my-dr-fake-archive-bucket",
             Key=file3,
             RestoreRequest=restore_req_exp,